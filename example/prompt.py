@@ -6,10 +6,84 @@
 从 YAML 文件中加载提示词，保持向后兼容性。
 """
 
+import functools
 import os
+import pickle
+import tempfile
 import yaml
 from pathlib import Path
 
+# 优先使用 libyaml 提供的 C 加载器，不可用时退回纯 Python 实现
+try:
+    from yaml import CSafeLoader as _YamlLoader
+    _USING_C_LOADER = True
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+    _USING_C_LOADER = False
+
+
+def _write_pickle_cache(cache_path: Path, prompts: tuple) -> None:
+    """
+    原子写入提示词的 pickle 缓存
+
+    Args:
+        cache_path: 缓存文件路径
+        prompts: 需要缓存的提示词
+    """
+    tmp_name = None
+    try:
+        # 先写入同目录的临时文件再替换，避免并发读取到写了一半的缓存
+        with tempfile.NamedTemporaryFile('wb', dir=cache_path.parent, delete=False) as tmp:
+            tmp_name = tmp.name
+            pickle.dump(prompts, tmp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, cache_path)
+    except OSError:
+        # 缓存只是加速手段，写入失败（如只读目录）不影响正常加载
+        if tmp_name:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+
+@functools.lru_cache(maxsize=4)
+def _load_prompts(yaml_path_str: str, yaml_mtime_ns: int) -> tuple:
+    """
+    解析提示词文件，同一进程内按 (路径, 修改时间) 缓存结果
+
+    Args:
+        yaml_path_str: 已解析为绝对路径的 YAML 文件路径
+        yaml_mtime_ns: YAML 文件的修改时间（纳秒），文件变化后自动失效
+
+    Returns:
+        (system_prompt, user_prompt) 元组，不可变，可安全地在调用方之间共享
+    """
+    yaml_path = Path(yaml_path_str)
+    # pickle 缓存放在 YAML 文件旁边，以修改时间判断是否过期
+    cache_path = yaml_path.with_suffix('.yml.pkl')
+    try:
+        if cache_path.stat().st_mtime_ns >= yaml_mtime_ns:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            # 旧版本缓存的是字典，格式不符时重新解析
+            if isinstance(cached, tuple) and len(cached) == 2:
+                return cached
+    except (OSError, pickle.UnpicklingError, EOFError):
+        # 缓存不存在或已损坏，重新解析 YAML
+        pass
+
+    with open(yaml_path, 'r', encoding='utf-8') as f:
+        if _USING_C_LOADER:
+            # libyaml 按块从文件句柄中读取，无需先整体读入内存
+            prompts = yaml.load(f, Loader=_YamlLoader)
+        else:
+            # 纯 Python 加载器逐行读取开销较大，一次性读入字符串再解析
+            prompts = yaml.load(f.read(), Loader=_YamlLoader)
+
+    result = (prompts.get('system_prompt', ''), prompts.get('user_prompt', ''))
+    _write_pickle_cache(cache_path, result)
+    return result
+
 
 def load_prompts_from_yaml(yaml_path: str = None) -> dict:
     """
@@ -25,14 +99,15 @@ def load_prompts_from_yaml(yaml_path: str = None) -> dict:
         # 获取当前文件所在目录
         current_dir = Path(__file__).parent
         yaml_path = current_dir / "prompt.yml"
+    # 解析为绝对路径，使相对路径与绝对路径命中同一缓存项
+    yaml_path = Path(yaml_path).resolve()
 
     try:
-        with open(yaml_path, 'r', encoding='utf-8') as f:
-            prompts = yaml.safe_load(f)
-        
+        yaml_mtime_ns = yaml_path.stat().st_mtime_ns
+        system_prompt, user_prompt = _load_prompts(str(yaml_path), yaml_mtime_ns)
         return {
-            'system_prompt': prompts.get('system_prompt', ''),
-            'user_prompt': prompts.get('user_prompt', '')
+            'system_prompt': system_prompt,
+            'user_prompt': user_prompt
         }
     except FileNotFoundError:
         raise FileNotFoundError(f"提示词文件不存在: {yaml_path}")
@@ -42,12 +117,29 @@ def load_prompts_from_yaml(yaml_path: str = None) -> dict:
         raise RuntimeError(f"加载提示词失败: {e}")
 
 
-# 从 YAML 文件加载提示词
-try:
-    prompts = load_prompts_from_yaml()
-    system_prompt = prompts['system_prompt']
-    user_prompt = prompts['user_prompt']
-except Exception as e:
-    # 如果加载失败，使用默认值（向后兼容）
-    import warnings
-    warnings.warn(f"无法从 YAML 文件加载提示词，使用默认值: {e}")
+# 首次访问 system_prompt / user_prompt 时才加载提示词（PEP 562），
+# 避免不使用提示词的代码路径在导入时也解析 YAML
+_prompts_cache = {}
+
+
+def __getattr__(name):
+    """
+    按需加载并缓存模块级提示词属性
+
+    Args:
+        name: 访问的属性名
+
+    Returns:
+        str: 对应的提示词内容
+    """
+    if name in ('system_prompt', 'user_prompt'):
+        if not _prompts_cache:
+            try:
+                _prompts_cache.update(load_prompts_from_yaml())
+            except Exception as e:
+                # 加载失败时保持与原先一致的警告行为
+                import warnings
+                warnings.warn(f"无法从 YAML 文件加载提示词，使用默认值: {e}")
+                raise AttributeError(name) from e
+        return _prompts_cache[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -20,20 +20,70 @@ Bilibili收藏夹同步主程序
 import sys
 import os
 import configparser
-import json
-import tempfile
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
 
-# 添加src目录到Python路径
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+# 添加src目录到Python路径：src 下的模块使用 `from Tools...`、`from get_subtitle ...`
+# 这类顶层导入，必须能在 sys.path 中找到 src；已存在时不重复添加
+_SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+if _SRC_DIR not in sys.path:
+    sys.path.append(_SRC_DIR)
 
 # 导入模块化工具
 from src.get_favorite import get_favorite_info
 from src.get_bv_info import BVInfoExtractor
 from src.data_sync import DataSyncManager
 
+# 已解析的配置缓存，键为 (配置文件路径, 修改时间)，文件未变化时直接复用
+_CONFIG_CACHE: Dict[tuple, tuple] = {}
+
+
+def _dequote(value: Optional[str]) -> Optional[str]:
+    """
+    去除配置值两端成对的双引号
+
+    Args:
+        value: 原始配置值，可能为None
+
+    Returns:
+        去除引号后的配置值
+    """
+    if value and len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _fetch_video_info(
+    target_bvs: List[str],
+    cookie_path: Optional[str],
+    use_threads: bool,
+    max_workers: int,
+) -> List[Dict]:
+    """
+    批量获取视频信息
+
+    Args:
+        target_bvs: 待获取信息的BV号列表
+        cookie_path: cookie文件路径
+        use_threads: 是否并发获取
+        max_workers: 并发线程数
+
+    Returns:
+        视频信息列表
+    """
+    extractor = BVInfoExtractor(cookie_path=cookie_path)
+    if use_threads:
+        # 每个视频需要调用多个B站接口，并发时各视频的请求发起间隔仍与串行获取相当，避免触发412风控
+        video_info_list = extractor.get_batch_video_info_concurrent(
+            target_bvs, max_workers=max_workers
+        )
+    else:
+        # 从1秒间隔起步，请求连续成功时逐步缩短到0.2秒，失败时再退避
+        video_info_list = extractor.get_batch_video_info(target_bvs, delay=1.0, min_delay=0.2)
+
+    return video_info_list
+
 
 def sync_workflow(
     media_id: int,
@@ -48,6 +98,11 @@ def sync_workflow(
     llm_timeout_sec: int = 40,
     max_original_subtitle_chars: int = 8000,
     max_video_duration_sec: int = 1800,
+    force: bool = False,
+    subtitle_cache: bool = False,
+    step4_use_threads: bool = False,
+    step4_max_workers: int = 2,
+    llm_rps: float = 5.0,
 ) -> bool:
     """
     执行完整的收藏夹同步工作流
@@ -60,6 +115,11 @@ def sync_workflow(
         api_key: 大模型 API 密钥
         model: 大模型名称
         base_url: 大模型 API 基础地址
+        force: 是否强制全量同步（忽略历史同步记录）
+        subtitle_cache: 是否将下载的字幕内容缓存到磁盘
+        step4_use_threads: 是否并发获取视频详细信息（步骤4）
+        step4_max_workers: 步骤4的并发线程数
+        llm_rps: 重新排版时每秒最多发起的大模型请求数
     Returns:
         同步是否成功
     """
@@ -90,26 +150,38 @@ def sync_workflow(
             llm_timeout_sec=llm_timeout_sec,
             max_original_subtitle_chars=max_original_subtitle_chars,
             max_video_duration_sec=max_video_duration_sec,
+            subtitle_cache=subtitle_cache,
+            llm_rps=llm_rps,
         )
-        synced_bvs = sync_manager.load_sync_record(media_id)
+        # 强制全量同步或收藏夹为空时无需解析历史记录
+        if force:
+            print("✓ 已开启强制同步，忽略历史同步记录")
+            synced_bvs = set()
+        elif bvids:
+            synced_bvs = sync_manager.load_sync_record(media_id)
+        else:
+            synced_bvs = set()
 
         # 步骤3: 筛选待同步视频
         print("\n步骤3: 筛选待同步视频...")
         if synced_bvs:
             # 存在历史记录，进行差量同步
             target_bvs = sync_manager.compare_and_filter(bvids, synced_bvs)
-            if not target_bvs:
-                print("✓ 没有新的视频需要同步")
-                return True
         else:
             # 不存在历史记录，同步全部视频
             target_bvs = bvids
             print(f"✓ 首次同步，将同步全部 {len(target_bvs)} 个视频")
 
+        # 没有差量时直接返回，不再创建提取器，也不产生任何网络请求和限速等待
+        if not target_bvs:
+            print("✓ 没有新的视频需要同步")
+            return True
+
         # 步骤4: 批量获取视频详细信息
         print(f"\n步骤4: 批量获取 {len(target_bvs)} 个视频的详细信息...")
-        extractor = BVInfoExtractor(cookie_path=cookie_path)
-        video_info_list = extractor.get_batch_video_info(target_bvs, delay=1.0)
+        video_info_list = _fetch_video_info(
+            target_bvs, cookie_path, step4_use_threads, step4_max_workers
+        )
 
         # 筛选成功获取信息的视频
         successful_videos = [video for video in video_info_list if video.get('success', False)]
@@ -119,52 +191,26 @@ def sync_workflow(
 
         print(f"✓ 成功获取 {len(successful_videos)} 个视频的信息")
 
-        # 保存视频信息到临时JSON文件（供data_sync模块使用）
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as temp_file:
-            json.dump(successful_videos, temp_file, ensure_ascii=False, indent=2)
-            temp_json_path = temp_file.name
+        # 步骤5 + 步骤6: 保存为Markdown文件并更新同步记录（直接使用内存中的视频信息）
+        print(f"\n步骤5: 保存 {len(successful_videos)} 个视频为Markdown文件...")
+        # 所有当前视频都算作已同步
+        success_count, failed_bvs, record_updated = sync_manager.save_batch(
+            successful_videos, media_id, list(dict.fromkeys(bvids))
+        )
 
-        try:
-            # 步骤5: 保存为Markdown文件
-            print(f"\n步骤5: 保存 {len(successful_videos)} 个视频为Markdown文件...")
-
-            if step5_use_threads:
-                # 并发执行
-                print(f"使用并发模式 (max_workers={step5_max_workers})")
-                success_count, failed_bvs = sync_manager.save_to_markdown_threads(successful_videos)
-            else:
-                # 串行执行
-                print("使用串行模式")
-                success_count = 0
-                failed_bvs = []
-                for video_info in successful_videos:
-                    if sync_manager.save_to_markdown(video_info):
-                        success_count += 1
-                    else:
-                        failed_bvs.append(video_info.get('bv', 'unknown'))
-
-            failed_count = len(failed_bvs)
-            failed_bvs_display = ", ".join(failed_bvs) if failed_bvs else "无"
-            print(f"✓ 成功保存: {success_count}/{len(successful_videos)} 个文件")
-            if failed_count > 0:
-                print(f"  失败数量: {failed_count}，失败BV: {failed_bvs_display}")
-
-            # 步骤6: 更新同步记录
-            print("\n步骤6: 更新同步记录...")
-            all_synced_bvs = list(set(bvids))  # 所有当前视频都算作已同步
-            if sync_manager.update_sync_record(media_id, all_synced_bvs):
-                print("✓ 同步记录更新成功")
-            else:
-                print("⚠ 同步完成，但更新记录失败")
-
-            return success_count > 0
-
-        finally:
-            # 清理临时文件
-            try:
-                os.unlink(temp_json_path)
-            except:
-                pass
+        failed_count = len(failed_bvs)
+        failed_bvs_display = ", ".join(failed_bvs) if failed_bvs else "无"
+        print(f"✓ 成功保存: {success_count}/{len(successful_videos)} 个文件")
+        if failed_count > 0:
+            print(f"  失败数量: {failed_count}，失败BV: {failed_bvs_display}")
+
+        print("\n步骤6: 更新同步记录...")
+        if record_updated:
+            print("✓ 同步记录更新成功")
+        else:
+            print("⚠ 同步完成，但更新记录失败")
+
+        return success_count > 0
 
     except Exception as e:
         print(f"❌ 同步过程中发生错误: {str(e)}")
@@ -173,50 +219,51 @@ def sync_workflow(
 
 def load_config():
     """从config/dev.ini加载配置参数"""
-    config = configparser.ConfigParser()
     config_file = os.path.join(os.path.dirname(__file__), 'config', 'dev.ini')
 
-    if not os.path.exists(config_file):
+    try:
+        config_mtime = os.stat(config_file).st_mtime_ns
+    except FileNotFoundError:
         print(f"❌ 错误：配置文件不存在: {config_file}")
         sys.exit(1)
 
+    cache_key = (config_file, config_mtime)
+    cached = _CONFIG_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    config = configparser.ConfigParser()
     try:
         config.read(config_file, encoding='utf-8')
 
         # 从Sync Parameters section读取参数
         sync_params = config['Sync Parameters']
 
-        media_id = sync_params.get('MEDIA_ID')
-        cookie_path = sync_params.get('COOKIE_PATH')
-        output_dir = sync_params.get('OUTPUT_DIR')
+        # 字符串参数统一去除两端引号
+        media_id = _dequote(sync_params.get('MEDIA_ID'))
+        cookie_path = _dequote(sync_params.get('COOKIE_PATH'))
+        output_dir = _dequote(sync_params.get('OUTPUT_DIR'))
+        force = sync_params.getboolean('FORCE', fallback=False)
+        subtitle_cache = sync_params.getboolean('SUBTITLE_CACHE', fallback=False)
+        step4_use_threads = sync_params.getboolean('STEP4_USE_THREADS', fallback=False)
+        step4_max_workers = sync_params.getint('STEP4_MAX_WORKERS', fallback=2)
 
         llm_params = config['LLM Parameters']
-        reformat = True if llm_params.get('REFORMAT') == 'True' else False
+        reformat = llm_params.getboolean('REFORMAT', fallback=False)
         api_key = llm_params.get('API_KEY')
         model = llm_params.get('MODEL')
         base_url = llm_params.get('BASE_URL')
-        step5_use_threads = True if llm_params.get('STEP5_USE_THREADS') == 'True' else False
+        step5_use_threads = llm_params.getboolean('STEP5_USE_THREADS', fallback=False)
         step5_max_workers = llm_params.getint('STEP5_MAX_WORKERS', fallback=2)
         llm_timeout_sec = llm_params.getint('LLM_TIMEOUT_SEC', fallback=40)
         max_original_subtitle_chars = llm_params.getint('MAX_ORIGINAL_SUBTITLE_CHARS', fallback=8000)
         max_video_duration_sec = llm_params.getint('MAX_VIDEO_DURATION_SEC', fallback=1800)
-
-        # 处理MEDIA_ID字符串格式（去除引号）
-        if media_id and media_id.startswith('"') and media_id.endswith('"'):
-            media_id = media_id[1:-1]
-
-        # 处理COOKIE_PATH字符串格式（去除引号）
-        if cookie_path and cookie_path.startswith('"') and cookie_path.endswith('"'):
-            cookie_path = cookie_path[1:-1]
+        llm_rps = llm_params.getfloat('LLM_RPS', fallback=5.0)
 
         # 如果cookie_path是默认值或空字符串，则设置为None以使用默认路径
         if not cookie_path or cookie_path == "qr_login.txt":
             cookie_path = None
 
-        # 处理OUTPUT_DIR字符串格式（去除引号）
-        if output_dir and output_dir.startswith('"') and output_dir.endswith('"'):
-            output_dir = output_dir[1:-1]
-
         # 转换media_id为整数
         try:
             media_id = int(media_id)
@@ -224,7 +271,11 @@ def load_config():
             print(f"❌ 错误：无效的MEDIA_ID格式: {media_id}")
             sys.exit(1)
 
-        return (
+        if llm_rps <= 0:
+            print(f"❌ 错误：LLM_RPS 必须为正数: {llm_rps}")
+            sys.exit(1)
+
+        result = (
             media_id,
             cookie_path,
             output_dir,
@@ -237,7 +288,14 @@ def load_config():
             llm_timeout_sec,
             max_original_subtitle_chars,
             max_video_duration_sec,
+            force,
+            subtitle_cache,
+            step4_use_threads,
+            step4_max_workers,
+            llm_rps,
         )
+        _CONFIG_CACHE[cache_key] = result
+        return result
 
     except Exception as e:
         print(f"❌ 错误：读取配置文件失败: {str(e)}")
@@ -260,10 +318,15 @@ def main():
         llm_timeout_sec,
         max_original_subtitle_chars,
         max_video_duration_sec,
+        force,
+        subtitle_cache,
+        step4_use_threads,
+        step4_max_workers,
+        llm_rps,
     ) = load_config()
 
-    # 检查cookie文件（如果指定）
-    if cookie_path and cookie_path != "qr_login.txt" and not os.path.exists(cookie_path):
+    # 检查cookie文件（如果指定）；load_config 已将默认值归一化为None，is_file 一次 stat 即可判断
+    if cookie_path is not None and not Path(cookie_path).is_file():
         print(f"❌ 错误：指定的cookie文件不存在: {cookie_path}")
         sys.exit(1)
 
@@ -292,6 +355,11 @@ def main():
         llm_timeout_sec,
         max_original_subtitle_chars,
         max_video_duration_sec,
+        force,
+        subtitle_cache,
+        step4_use_threads,
+        step4_max_workers,
+        llm_rps,
     )
 
     print("\n" + "=" * 50)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+各脚本共用的基础工具
+
+- JSON 序列化与文件读写：优先使用 orjson，未安装时退回标准库 json
+- 原子写入：先写入同目录的临时文件再替换目标文件
+- RequestThrottle：并发请求时错开各线程的请求发起时间
+- BatchFetcher：批量获取的节流、成功/失败计数与线程池并发获取
+"""
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+# orjson 为可选依赖，未安装时退回标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads_json(data: bytes):
+    """
+    解析JSON字节串，优先使用 orjson
+
+    Args:
+        data: JSON字节串
+
+    Returns:
+        解析后的Python对象
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    将对象序列化为JSON（UTF-8字节，中文不转义），优先使用 orjson
+
+    Args:
+        obj: 待序列化的对象
+        indent: 是否以2空格缩进输出，默认为False（紧凑格式）
+        sort_keys: 是否按键排序，默认为False
+
+    Returns:
+        JSON字节串
+    """
+    if orjson is not None:
+        option = 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=sort_keys).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+
+
+def dumps_json_line(obj) -> bytes:
+    """
+    将对象序列化为一行紧凑JSON（以换行结尾），用于 JSON Lines 输出
+
+    Args:
+        obj: 待序列化的对象
+
+    Returns:
+        JSON行字节串
+    """
+    return dumps_json(obj) + b'\n'
+
+
+def load_json_file(file_path):
+    """
+    读取并解析JSON文件，优先使用 orjson
+
+    Args:
+        file_path: JSON文件路径
+
+    Returns:
+        解析后的Python对象
+    """
+    with open(file_path, 'rb') as f:
+        return loads_json(f.read())
+
+
+def atomic_write_bytes(file_path, content: bytes) -> None:
+    """
+    原子写入文件：先写入同目录的临时文件再替换目标文件
+
+    进程中断或并发读取时不会看到写了一半的文件；写入失败时清理临时文件并抛出异常。
+
+    Args:
+        file_path: 目标文件路径
+        content: 待写入的字节
+    """
+    tmp_name = None
+    try:
+        with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(os.path.abspath(file_path)), delete=False) as tmp:
+            tmp_name = tmp.name
+            tmp.write(content)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        if tmp_name:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+        raise
+
+
+def dump_json_file(data, file_path, indent: bool = True, sort_keys: bool = False, atomic: bool = False) -> None:
+    """
+    写入JSON文件，优先使用 orjson（输出UTF-8，中文不转义）
+
+    Args:
+        data: 待写入的数据
+        file_path: 文件路径
+        indent: 是否以2空格缩进输出，默认为True
+        sort_keys: 是否按键排序，默认为False
+        atomic: 是否原子写入（先写临时文件再替换），默认为False
+    """
+    content = dumps_json(data, indent=indent, sort_keys=sort_keys)
+    if atomic:
+        atomic_write_bytes(file_path, content)
+        return
+    with open(file_path, 'wb') as f:
+        f.write(content)
+
+
+class RequestThrottle:
+    """
+    在多个线程之间错开请求发起时间
+
+    所有线程共享同一个时间点，相邻两次请求之间至少间隔 min_interval，
+    再叠加 0 到 jitter 秒的随机抖动，避免并发请求同时到达服务端；
+    平均间隔为 min_interval + jitter / 2。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    def wait(self, min_interval: float, jitter: Optional[float] = None) -> None:
+        """
+        阻塞到允许发起下一次请求的时间点
+
+        Args:
+            min_interval: 相邻两次请求的最小间隔（秒）
+            jitter: 叠加在间隔上的随机抖动上限（秒），默认为None与 min_interval 相同；
+                为0时严格按 min_interval 间隔发起请求
+        """
+        if jitter is None:
+            jitter = min_interval
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            if wait > 0:
+                time.sleep(wait)
+            self._next_request_at = max(now, self._next_request_at) + min_interval + random.uniform(0, jitter)
+
+
+class BatchFetcher:
+    """
+    批量获取的公共部分：请求节流、成功/失败计数与线程池并发获取
+
+    子类在 __init__ 中调用 super().__init__()，批量获取前调用 _reset_counts()，
+    单个结果（带 success 字段的字典）经 _tally_result() 计数。
+    """
+
+    def __init__(self):
+        # 并发获取时用于错开各线程的请求发起时间
+        self._throttle = RequestThrottle()
+
+        # 最近一次批量获取的成功/失败数量，在获取过程中累计，无需事后再遍历结果
+        self.last_success_count = 0
+        self.last_fail_count = 0
+
+    def _reset_counts(self) -> None:
+        """开始新一批获取前清零成功/失败计数"""
+        self.last_success_count = 0
+        self.last_fail_count = 0
+
+    def _tally_result(self, result: Dict) -> Dict:
+        """
+        累计批量获取的成功/失败数量
+
+        Args:
+            result: 单个条目的获取结果
+
+        Returns:
+            原样返回传入的结果，便于在产出结果时顺带计数
+        """
+        if result.get('success', False):
+            self.last_success_count += 1
+        else:
+            self.last_fail_count += 1
+        return result
+
+    def _iter_concurrent(
+        self,
+        fetch: Callable[[Any], Dict],
+        items: Iterable,
+        max_workers: int,
+        min_interval: float,
+    ) -> Iterator[Dict]:
+        """
+        使用线程池并发获取，逐个产出已计数的结果
+
+        每次调用 fetch 前先经共享的节流器错开发起时间。
+
+        Args:
+            fetch: 获取单个条目的函数，返回带 success 字段的字典
+            items: 待获取的条目
+            max_workers: 最大并发线程数
+            min_interval: 相邻两次调用 fetch 的最小间隔（秒）
+
+        Yields:
+            获取结果，顺序与 items 一致
+        """
+        def throttled_fetch(item) -> Dict:
+            self._throttle.wait(min_interval)
+            return fetch(item)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # executor.map 按提交顺序返回结果，后续条目在后台继续获取
+            for result in executor.map(throttled_fetch, items):
+                yield self._tally_result(result)
@@ -10,9 +10,20 @@ import sys
 import os
 import argparse
 import time
+import functools
+from pathlib import Path
 from Tools.bili_tools import biliLogin
+from Tools.config import useragent
 from Tools.util.Colorful_Console import ColoredText as CT
 
+_USER_AGENT = useragent().pcChrome
+
+# 重复使用的彩色标题与分隔线，只在导入时生成一次
+_SEP_BLUE = CT('=' * 50).blue()
+_QR_HEADER_BLUE = CT('B站二维码登录工具').blue()
+_HEADER_BLUE = CT('B站Cookie获取工具').blue()
+_VERIFY_HEADER_BLUE = CT('B站Cookie验证工具').blue()
+
 
 def create_directory_if_not_exists(path):
     """
@@ -21,16 +32,69 @@ def create_directory_if_not_exists(path):
     Args:
         path (str): 目录路径
     """
-    if not os.path.exists(path):
-        try:
-            os.makedirs(path)
-            print(f"{CT('已创建目录: ').green()}{path}")
-        except Exception as e:
-            print(f"{CT('创建目录失败: ').red()}{str(e)}")
-            return False
+    try:
+        # 直接尝试创建，已存在时由 FileExistsError 判断，省去一次 exists 调用
+        Path(path).mkdir(parents=True)
+        print(f"{CT('已创建目录: ').green()}{path}")
+    except FileExistsError:
+        pass
+    except OSError as e:
+        print(f"{CT('创建目录失败: ').red()}{str(e)}")
+        return False
     return True
 
 
+@functools.lru_cache(maxsize=8)
+def _make_verifier(cookie_file, mtime_ns):
+    """
+    读取cookie文件并构造用于验证登录状态的biliLogin实例
+
+    同一进程内按 (文件路径, 修改时间) 缓存，cookie文件未变化时不再重复读取
+
+    Args:
+        cookie_file (str): cookie文件路径
+        mtime_ns (int): cookie文件的修改时间（纳秒），用作缓存键
+
+    Returns:
+        biliLogin: 携带该cookie请求头的biliLogin实例
+    """
+    cookie_content = Path(cookie_file).read_text(encoding='utf-8').strip()
+    headers = {
+        "User-Agent": _USER_AGENT,
+        "Cookie": cookie_content,
+        'referer': "https://www.bilibili.com"
+    }
+    return biliLogin(headers)
+
+
+def _check_login(bili_login):
+    """
+    查询登录状态
+
+    Args:
+        bili_login (biliLogin): 携带cookie请求头的biliLogin实例
+
+    Returns:
+        dict | None: 已登录时返回登录信息，否则返回None
+    """
+    login_info = bili_login.get_login_state()
+    return login_info if login_info.get('data', {}).get('isLogin') else None
+
+
+def _print_login_info(login_info):
+    """
+    打印登录用户的基本信息
+
+    Args:
+        login_info (dict): get_login_state 返回的登录信息
+    """
+    data = login_info['data']
+    print(f"{CT('用户信息:').yellow()}")
+    print(f"  用户名: {data['uname']}")
+    print(f"  用户ID: {data['mid']}")
+    print(f"  等级: {data['level_info']['current_level']}")
+
+
 def login_with_qr(save_path="cookie", save_name="qr_login", full_path=None, img_show=True):
     """
     通过二维码登录获取cookie
@@ -45,8 +109,8 @@ def login_with_qr(save_path="cookie", save_name="qr_login", full_path=None, img_
         bool: 登录是否成功
     """
     try:
-        print(f"{CT('B站二维码登录工具').blue()}")
-        print(f"{CT('=' * 50).blue()}")
+        print(_QR_HEADER_BLUE)
+        print(_SEP_BLUE)
 
         # 创建biliLogin实例
         bili_login = biliLogin()
@@ -73,21 +137,12 @@ def login_with_qr(save_path="cookie", save_name="qr_login", full_path=None, img_
             print(f"{CT('Cookie已保存到: ').green()}{cookie_file}")
 
             # 验证登录状态
-            headers = {
-                "User-Agent": bili_login.headers["User-Agent"],
-                "Cookie": open(cookie_file, 'r').read(),
-                'referer': "https://www.bilibili.com"
-            }
+            verify_login = _make_verifier(cookie_file, os.stat(cookie_file).st_mtime_ns)
+            login_info = _check_login(verify_login)
 
-            verify_login = biliLogin(headers)
-            login_info = verify_login.get_login_state()
-
-            if login_info["data"]["isLogin"]:
+            if login_info:
                 print(f"{CT('登录验证成功！').green()}")
-                print(f"{CT('用户信息:').yellow()}")
-                print(f"  用户名: {login_info['data']['uname']}")
-                print(f"  用户ID: {login_info['data']['mid']}")
-                print(f"  等级: {login_info['data']['level_info']['current_level']}")
+                _print_login_info(login_info)
                 return True
             else:
                 print(f"{CT('警告: 登录验证失败，但cookie已保存').red()}")
@@ -112,35 +167,23 @@ def verify_cookie(cookie_file):
         bool: cookie是否有效
     """
     try:
-        if not os.path.exists(cookie_file):
+        # 读取cookie
+        try:
+            bili_login = _make_verifier(cookie_file, os.stat(cookie_file).st_mtime_ns)
+        except FileNotFoundError:
             print(f"{CT('Cookie文件不存在: ').red()}{cookie_file}")
             return False
 
-        # 读取cookie
-        with open(cookie_file, 'r', encoding='utf-8') as f:
-            cookie_content = f.read().strip()
-
-        if not cookie_content:
+        if not bili_login.headers["Cookie"]:
             print(f"{CT('Cookie文件为空: ').red()}{cookie_file}")
             return False
 
-        # 创建headers
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36 Edg/125.0.0.0",
-            "Cookie": cookie_content,
-            'referer': "https://www.bilibili.com"
-        }
-
         # 验证登录状态
-        bili_login = biliLogin(headers)
-        login_info = bili_login.get_login_state()
+        login_info = _check_login(bili_login)
 
-        if login_info["data"]["isLogin"]:
+        if login_info:
             print(f"{CT('Cookie有效！').green()}")
-            print(f"{CT('用户信息:').yellow()}")
-            print(f"  用户名: {login_info['data']['uname']}")
-            print(f"  用户ID: {login_info['data']['mid']}")
-            print(f"  等级: {login_info['data']['level_info']['current_level']}")
+            _print_login_info(login_info)
             return True
         else:
             print(f"{CT('Cookie无效或已过期').red()}")
@@ -185,14 +228,14 @@ def main():
 
     # 验证模式
     if args.verify:
-        print(f"{CT('B站Cookie验证工具').blue()}")
-        print(f"{CT('=' * 50).blue()}")
+        print(_VERIFY_HEADER_BLUE)
+        print(_SEP_BLUE)
         success = verify_cookie(args.verify)
         sys.exit(0 if success else 1)
 
     # 登录模式
-    print(f"{CT('B站Cookie获取工具').blue()}")
-    print(f"{CT('=' * 50).blue()}")
+    print(_HEADER_BLUE)
+    print(_SEP_BLUE)
 
     # 创建保存目录
     if not args.full_path:
@@ -16,16 +16,116 @@ Bilibili收藏夹数据同步和转换工具
     python data_sync.py --json-file src/output/bv_info_20251102_215941.json --media-id 3656879060 --output-dir output/markdown
 """
 
-import json
 import os
 import sys
 import argparse
 import re
+import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Set, Optional, Tuple
+from typing import List, Dict, Set, Optional, Tuple, Collection
 from pathlib import Path
 from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+
+from common import load_json_file, dump_json_file
+from get_subtitle import SubtitleExtractor, DEFAULT_SUBTITLE_CACHE_DIR
+
+# 预编译的正则表达式，避免每次调用时查找正则缓存
+# Windows文件名中的非法字符，逐字符替换为下划线（str.translate 查表，无需正则引擎）
+_ILLEGAL_FILENAME_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+_EXCESS_NEWLINES_RE = re.compile(r'\n{3,}')
+# datetime.isoformat() 生成的时间格式（fetch_time），可直接截取各字段而无需构造 datetime
+_ISO_DATETIME_RE = re.compile(r'(\d{4}-\d{2}-\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.\d{1,6})?(?:Z|[+-]\d{2}:\d{2})?')
+
+# clean_markdown_content 需要处理的记号及其替换结果：
+# - JSON 字符串中字面的转义序列（\\、\n、\t、\"、\'）还原为对应字符，
+#   双反斜杠优先匹配，保证 "\\n" 还原为反斜杠加字母 n 而不是换行
+# - 回车（字面的 \r 或真实的 CR）与其后紧跟的换行合并，统一为 \n
+# - NUL 字符与旧实现保持一致，输出为反斜杠
+_MARKDOWN_TOKEN_MAP = {
+    '\\\\': '\\',
+    '\\n': '\n',
+    '\\t': '\t',
+    '\\"': '"',
+    "\\'": "'",
+    '\x00': '\\',
+}
+for _cr in ('\r', '\\r'):
+    _MARKDOWN_TOKEN_MAP[_cr] = '\n'
+    for _lf in ('\n', '\\n'):
+        _MARKDOWN_TOKEN_MAP[_cr + _lf] = '\n'
+_MARKDOWN_TOKEN_RE = re.compile(r'(?:\r|\\r)(?:\n|\\n)?|\\[\\nt"\']|\x00')
+
+
+def _replace_markdown_token(match: re.Match) -> str:
+    """
+    _MARKDOWN_TOKEN_RE 的替换回调
+
+    Args:
+        match: 匹配到的记号
+
+    Returns:
+        替换后的字符串
+    """
+    return _MARKDOWN_TOKEN_MAP[match.group()]
+
+
+def _write_text_file(filepath, content: str) -> None:
+    """
+    以UTF-8一次性写入文本文件，直接使用 os.open/os.write，省去 TextIOWrapper 与缓冲层
+
+    Args:
+        filepath: 文件路径
+        content: 文件内容
+    """
+    # 与文本模式 open() 的行为保持一致：按平台换行符写出
+    if os.linesep != '\n':
+        content = content.replace('\n', os.linesep)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0)
+    fd = os.open(filepath, flags, 0o644)
+    try:
+        data = memoryview(content.encode('utf-8'))
+        # os.write 可能只写入部分数据，循环直到全部写完
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+
+def _format_core_field(field: str, value):
+    """
+    转换核心字段的取值格式（time 与 fetch_time 转为标准时间格式，其余字段原样返回）
+
+    Args:
+        field: 字段名
+        value: 字段原始值
+
+    Returns:
+        转换后的字段值
+    """
+    if field == 'time' and isinstance(value, (int, float)):
+        # Unix时间戳转换为标准时间格式（time.localtime 不创建 datetime 对象，直接格式化各字段）
+        lt = time.localtime(value)
+        return (
+            f"{lt.tm_year:04d}-{lt.tm_mon:02d}-{lt.tm_mday:02d} "
+            f"{lt.tm_hour:02d}-{lt.tm_min:02d}-{lt.tm_sec:02d}"
+        )
+
+    if field == 'fetch_time':
+        # ISO格式时间戳转换为标准时间格式
+        try:
+            match = _ISO_DATETIME_RE.fullmatch(value)
+            if match:
+                # 常见格式直接拼接已有字段，省去 datetime 解析与 strftime
+                return f"{match[1]} {match[2]}-{match[3]}-{match[4]}"
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            return dt.strftime('%Y-%m-%d %H-%M-%S')
+        except:
+            # 如果转换失败，保持原格式
+            pass
+
+    return value
 
 
 class DataSyncManager:
@@ -44,6 +144,8 @@ class DataSyncManager:
         llm_timeout_sec: int = 40,
         max_original_subtitle_chars: int = 8000,
         max_video_duration_sec: int = 1800,
+        subtitle_cache: bool = False,
+        llm_rps: Optional[float] = 5.0,
     ):
         """
         初始化数据同步管理器
@@ -55,6 +157,8 @@ class DataSyncManager:
             api_key: 大模型 API 密钥，默认为None
             model: 大模型名称，默认为None
             base_url: 大模型 API 基础地址，默认为None
+            subtitle_cache: 是否将下载的字幕内容缓存到磁盘，默认为False
+            llm_rps: 重新排版时每秒最多发起的大模型请求数，默认为5；为None时不限速
         """
         self.output_dir = Path(output_dir)
         self.sync_records_dir = Path(sync_records_dir)
@@ -75,33 +179,74 @@ class DataSyncManager:
         self.llm_timeout_sec = llm_timeout_sec
         self.max_original_subtitle_chars = max_original_subtitle_chars
         self.max_video_duration_sec = max_video_duration_sec
+        self.subtitle_cache = subtitle_cache
+        self.llm_rps = llm_rps
+
+        # 并发保存时保护文件名分配，避免同名视频选中同一路径后互相覆盖
+        self._filename_lock = threading.Lock()
+        # 输出目录中已存在或已分配的文件名（经 os.path.normcase 处理），用集合查找代替逐个 stat
+        self._taken_names: Set[str] = set()
+        # 每个基础文件名下一次尝试的编号，避免同名视频每次都从 _1 开始探测
+        self._next_suffix: Dict[str, int] = {}
+
+        # 字幕提取器在首次使用时创建；并发获取字幕时由锁保证只创建一个实例
+        self._subtitle_extractor_instance: Optional[SubtitleExtractor] = None
+        self._subtitle_extractor_lock = threading.Lock()
 
-    def extract_video_list(self, json_file: str) -> List[str]:
+    def load_video_data(self, json_file: str) -> List[Dict]:
         """
-        从原始JSON数据中提取视频BV列表
+        读取原始JSON数据文件（同一次同步只需解析一次）
 
         Args:
             json_file: JSON文件路径
 
         Returns:
-            BV号列表
+            视频信息列表，读取失败时返回空列表
         """
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json_file(json_file)
+            if not isinstance(data, list):
+                raise ValueError("JSON文件格式不正确，应为列表格式")
+            return data
 
-            # 提取所有成功获取的视频的BV号
-            bv_list = []
+        except Exception as e:
+            print(f"读取JSON数据失败: {e}")
+            return []
+
+    def build_bv_index(self, data: List[Dict]) -> Dict[str, Dict]:
+        """
+        为成功获取的视频建立 BV号 → 视频信息 的索引（每次同步只构建一次）
+
+        Args:
+            data: 已解析的原始视频信息列表
+
+        Returns:
+            按原始顺序排列的BV号到视频信息的字典，重复的BV号保留首次出现的条目
+        """
+        try:
+            bv_index = {}
             for item in data:
                 if item.get('success', False) and 'bv' in item:
-                    bv_list.append(item['bv'])
-
-            print(f"从 {json_file} 中提取到 {len(bv_list)} 个视频")
-            return bv_list
+                    bv_index.setdefault(item['bv'], item)
+            return bv_index
 
         except Exception as e:
             print(f"提取视频列表失败: {e}")
-            return []
+            return {}
+
+    def extract_video_list(self, bv_index: Dict[str, Dict]) -> List[str]:
+        """
+        从视频索引中提取视频BV列表
+
+        Args:
+            bv_index: build_bv_index 生成的视频索引
+
+        Returns:
+            BV号列表
+        """
+        bv_list = list(bv_index)
+        print(f"从数据中提取到 {len(bv_list)} 个视频")
+        return bv_list
 
     def load_sync_record(self, media_id: int) -> Set[str]:
         """
@@ -121,13 +266,11 @@ class DataSyncManager:
             print(f"未找到收藏夹 {media_id} 的历史同步记录")
             return set()
 
-        # 按文件名排序，取最新的
-        record_files.sort(key=lambda x: x.name, reverse=True)
-        latest_record = record_files[0]
+        # 文件名中带有时间戳，文件名最大的即为最新记录（O(n)，无需整体排序）
+        latest_record = max(record_files, key=lambda x: x.name)
 
         try:
-            with open(latest_record, 'r', encoding='utf-8') as f:
-                record_data = json.load(f)
+            record_data = load_json_file(latest_record)
 
             synced_bvs = set(record_data.get('synced_bvs', []))
             print(f"从历史记录中读取到 {len(synced_bvs)} 个已同步视频")
@@ -148,45 +291,31 @@ class DataSyncManager:
         Returns:
             需要同步的BV号列表
         """
-        current_set = set(current_bvs)
-        new_bvs = current_set - synced_bvs
+        # 单次遍历 + 集合成员判断，O(n) 完成差量计算，并保持收藏夹中的原始顺序
+        new_bvs = list(dict.fromkeys(bv for bv in current_bvs if bv not in synced_bvs))
 
         print(f"当前视频总数: {len(current_bvs)}")
         print(f"已同步视频数: {len(synced_bvs)}")
         print(f"需要同步视频数: {len(new_bvs)}")
 
-        return list(new_bvs)
+        return new_bvs
 
-    def extract_video_info(self, json_file: str, target_bvs: List[str]) -> List[Dict]:
+    def extract_video_info(self, bv_index: Dict[str, Dict], target_bvs: List[str]) -> List[Dict]:
         """
-        从原始JSON数据中提取目标视频的完整信息
+        从视频索引中提取目标视频的完整信息
 
         Args:
-            json_file: JSON文件路径
+            bv_index: build_bv_index 生成的视频索引
             target_bvs: 目标BV号列表
 
         Returns:
             视频信息列表
         """
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            target_set = set(target_bvs)
-            video_info_list = []
-
-            for item in data:
-                if (item.get('success', False) and
-                    'bv' in item and
-                    item['bv'] in target_set):
-                    video_info_list.append(item)
-
-            print(f"成功提取 {len(video_info_list)} 个视频的完整信息")
-            return video_info_list
+        # 按索引直接查找，只需 O(目标数) 次字典访问，无需再扫描全部数据
+        video_info_list = [bv_index[bv] for bv in target_bvs if bv in bv_index]
 
-        except Exception as e:
-            print(f"提取视频信息失败: {e}")
-            return []
+        print(f"成功提取 {len(video_info_list)} 个视频的完整信息")
+        return video_info_list
 
     def filter_core_fields(self, video_info: Dict) -> Dict:
         """
@@ -198,28 +327,12 @@ class DataSyncManager:
         Returns:
             筛选后的核心信息
         """
-        core_info = {}
-
-        # 筛选核心字段
-        for field in self.core_fields:
-            if field in video_info:
-                core_info[field] = video_info[field]
-
-        # 转换时间戳格式
-        if 'time' in core_info and isinstance(core_info['time'], (int, float)):
-            # Unix时间戳转换为标准时间格式
-            core_info['time'] = datetime.fromtimestamp(core_info['time']).strftime('%Y-%m-%d %H-%M-%S')
-
-        if 'fetch_time' in core_info:
-            # ISO格式时间戳转换为标准时间格式
-            try:
-                dt = datetime.fromisoformat(core_info['fetch_time'].replace('Z', '+00:00'))
-                core_info['fetch_time'] = dt.strftime('%Y-%m-%d %H-%M-%S')
-            except:
-                # 如果转换失败，保持原格式
-                pass
-
-        return core_info
+        # 筛选核心字段并转换时间戳格式
+        return {
+            field: _format_core_field(field, video_info[field])
+            for field in self.core_fields
+            if field in video_info
+        }
 
     def sanitize_filename(self, filename: str, max_length: int = 100) -> str:
         """
@@ -233,11 +346,10 @@ class DataSyncManager:
             处理后的安全文件名
         """
         # 移除或替换Windows文件名中的非法字符
-        illegal_chars = r'[<>:"/\\|?*]'
-        safe_name = re.sub(illegal_chars, '_', filename)
+        safe_name = filename.translate(_ILLEGAL_FILENAME_TABLE)
 
-        # 移除多余的空格和点
-        safe_name = re.sub(r'\s+', ' ', safe_name).strip()
+        # 移除多余的空格和点（split 按任意空白切分，合并连续空白并去掉首尾空白）
+        safe_name = ' '.join(safe_name.split())
         safe_name = safe_name.strip('.')
 
         # 限制长度
@@ -263,34 +375,51 @@ class DataSyncManager:
         if not content:
             return ""
         
-        cleaned = content
-        
-        # 首先处理反斜杠转义，注意顺序很重要
-        # 先处理双反斜杠，避免影响其他转义字符的处理
-        cleaned = cleaned.replace('\\\\', '\x00')  # 临时替换，避免干扰
-        
-        # 处理 JSON 字符串中的转义字符（字面的 \n, \t, \r 等）
-        cleaned = cleaned.replace('\\n', '\n')
-        cleaned = cleaned.replace('\\t', '\t')
-        cleaned = cleaned.replace('\\r', '\r')
-        cleaned = cleaned.replace('\\"', '"')
-        cleaned = cleaned.replace("\\'", "'")
-        
-        # 恢复真正的反斜杠
-        cleaned = cleaned.replace('\x00', '\\')
-        
-        # 规范化换行符：统一使用 \n
-        cleaned = cleaned.replace('\r\n', '\n').replace('\r', '\n')
+        # 单次扫描同时完成转义还原与换行规范化（原先需要九次 str.replace）
+        cleaned = _MARKDOWN_TOKEN_RE.sub(_replace_markdown_token, content)
         
         # 移除开头和结尾的多余空白字符
         cleaned = cleaned.strip()
         
         # 移除连续的空行（保留最多两个连续换行，用于 Markdown 段落分隔）
         # 将3个或更多连续换行符替换为2个换行符
-        cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
+        cleaned = _EXCESS_NEWLINES_RE.sub('\n\n', cleaned)
         
         return cleaned
 
+    @property
+    def _subtitle_extractor(self) -> SubtitleExtractor:
+        """
+        整个同步过程共用的字幕提取器，首次使用时创建（线程安全）
+
+        Returns:
+            SubtitleExtractor 实例
+        """
+        if self._subtitle_extractor_instance is None:
+            with self._subtitle_extractor_lock:
+                if self._subtitle_extractor_instance is None:
+                    self._subtitle_extractor_instance = self._create_subtitle_extractor()
+        return self._subtitle_extractor_instance
+
+    def _create_subtitle_extractor(self) -> SubtitleExtractor:
+        """
+        按当前配置创建字幕提取器
+
+        Returns:
+            SubtitleExtractor 实例
+        """
+        return SubtitleExtractor(
+            reformat=self.reformat,
+            api_key=self.api_key,
+            model=self.model,
+            base_url=self.base_url,
+            llm_timeout_sec=self.llm_timeout_sec,
+            max_original_subtitle_chars=self.max_original_subtitle_chars,
+            max_video_duration_sec=self.max_video_duration_sec,
+            cache_dir=DEFAULT_SUBTITLE_CACHE_DIR if self.subtitle_cache else None,
+            llm_rps=self.llm_rps,
+        )
+
     def extract_subtitle_content(self, video_info: Dict) -> str:
         """
         从视频信息中提取字幕内容，按优先级选择：
@@ -307,22 +436,8 @@ class DataSyncManager:
             字幕内容字符串
         """
         try:
-            # 导入字幕提取器
-            from get_subtitle import SubtitleExtractor
-            
-            # 创建字幕提取器实例
-            subtitle_extractor = SubtitleExtractor(
-                reformat=self.reformat,
-                api_key=self.api_key,
-                model=self.model,
-                base_url=self.base_url,
-                llm_timeout_sec=self.llm_timeout_sec,
-                max_original_subtitle_chars=self.max_original_subtitle_chars,
-                max_video_duration_sec=self.max_video_duration_sec,
-            )
-            
-            # 获取单个视频的字幕（启用排版功能）
-            subtitle_result = subtitle_extractor.get_video_subtitles(
+            # 获取单个视频的字幕（启用排版功能），字幕提取器在多个视频间共用
+            subtitle_result = self._subtitle_extractor.get_video_subtitles(
                 video_info, 
                 reformat=True
             )
@@ -368,65 +483,121 @@ class DataSyncManager:
             print(f"  警告：获取字幕失败 ({video_info.get('bv', 'unknown')}): {e}")
             return "无视频字幕"
 
-    def save_to_markdown(self, video_info: Dict) -> bool:
+    def _refresh_taken_names(self) -> None:
+        """
+        读取一次输出目录，把已存在的文件名并入 _taken_names，调用方需持有 _filename_lock
+        """
+        try:
+            self._taken_names.update(os.path.normcase(name) for name in os.listdir(self.output_dir))
+        except OSError:
+            # 目录不可读时保留已登记的文件名，写入阶段会报告具体错误
+            pass
+
+    def _reserve_filepath(self, title: str, check_disk: bool = False) -> Path:
+        """
+        为视频分配不冲突的Markdown文件路径并登记，调用方需持有 _filename_lock
+
+        Args:
+            title: 视频标题
+            check_disk: 是否对候选文件名调用 exists() 检查磁盘；
+                批量分配前已读取过输出目录时为False，只在内存集合中查找
+
+        Returns:
+            分配到的文件路径
+        """
+        safe_filename = self.sanitize_filename(title)
+        filename = f"{safe_filename}.md"
+
+        # 处理文件名冲突：先在内存集合中查找，单独保存时再确认磁盘上不存在同名文件
+        counter = self._next_suffix.get(safe_filename, 1)
+        while os.path.normcase(filename) in self._taken_names or (
+            check_disk and (self.output_dir / filename).exists()
+        ):
+            filename = f"{safe_filename}_{counter}.md"
+            counter += 1
+        self._next_suffix[safe_filename] = counter
+        self._taken_names.add(os.path.normcase(filename))
+        return self.output_dir / filename
+
+    def allocate_filepaths(self, video_info_list: List[Dict]) -> List[Path]:
+        """
+        在保存前一次性为所有视频分配文件路径
+
+        在同一把锁内按列表顺序分配，工作线程只需负责写文件，
+        同名视频的编号也不再取决于线程完成的先后顺序。
+
+        Args:
+            video_info_list: 视频信息列表
+
+        Returns:
+            与 video_info_list 一一对应的文件路径列表，分配失败的位置为None
+        """
+        filepaths = []
+        with self._filename_lock:
+            self._refresh_taken_names()
+            for video_info in video_info_list:
+                try:
+                    filepaths.append(self._reserve_filepath(video_info.get('title', 'untitled')))
+                except Exception:
+                    # 标题异常时留给 save_to_markdown 报告失败，不影响其他视频
+                    filepaths.append(None)
+        return filepaths
+
+    def save_to_markdown(
+        self,
+        video_info: Dict,
+        filepath: Optional[Path] = None,
+        subtitle_content: Optional[str] = None,
+    ) -> bool:
         """
         将视频信息保存为Markdown文件
 
         Args:
             video_info: 视频信息
+            filepath: 预先分配的文件路径，为None时在此处分配
+            subtitle_content: 预先获取的字幕内容，为None时在此处获取
 
         Returns:
             是否保存成功
         """
         try:
-            # 筛选核心信息
-            core_info = self.filter_core_fields(video_info)
-
             # 生成文件名
-            title = core_info.get('title', 'untitled')
-            safe_filename = self.sanitize_filename(title)
-            filepath = self.output_dir / f"{safe_filename}.md"
-
-            # 处理文件名冲突
-            counter = 1
-            while filepath.exists():
-                filepath = self.output_dir / f"{safe_filename}_{counter}.md"
-                counter += 1
-
-            # 生成Front Matter
-            front_matter = []
-            front_matter.append("---")
-            for key, value in core_info.items():
-                if key == 'desc':
-                    # 描述内容可能较长，单独处理
-                    continue
-                front_matter.append(f"{key}: {value}")
-            front_matter.append("---")
-
-            # 生成Markdown内容
-            content_lines = front_matter.copy()
-            content_lines.append("")  # 空行
-
-            # 添加描述内容
-            if 'desc' in core_info and core_info['desc']:
-                content_lines.append(f"# {title}")
-                content_lines.append("")
-                content_lines.append(core_info['desc'])
-            else:
-                content_lines.append(f"# {title}")
-                content_lines.append("")
-                content_lines.append("*该视频暂无描述*")
-
-            # 添加字幕内容（内部会自动获取字幕）
-            content_lines.append("")  # 空行
-            content_lines.append("## 视频字幕")
-            content_lines.append("")
-            subtitle_content = self.extract_subtitle_content(video_info)
-            content_lines.append(subtitle_content)
+            title = video_info.get('title', 'untitled')
+            if filepath is None:
+                # 单独保存一个视频时不读取整个输出目录，只对候选文件名逐个 exists() 检查
+                with self._filename_lock:
+                    filepath = self._reserve_filepath(title, check_disk=True)
+
+            # 筛选核心信息并直接生成Front Matter，不再构造中间字典
+            # （描述内容可能较长，不放入Front Matter，单独处理）
+            front_matter = [
+                f"{field}: {_format_core_field(field, video_info[field])}"
+                for field in self.core_fields
+                if field != 'desc' and field in video_info
+            ]
+
+            # 未预先获取字幕时在此处获取
+            if subtitle_content is None:
+                subtitle_content = self.extract_subtitle_content(video_info)
+
+            # 一次性组装Markdown内容：Front Matter、标题、描述、字幕
+            desc = video_info.get('desc')
+            content_lines = [
+                "---",
+                *front_matter,
+                "---",
+                "",
+                f"# {title}",
+                "",
+                desc if desc else "*该视频暂无描述*",
+                "",
+                "## 视频字幕",
+                "",
+                subtitle_content,
+            ]
 
             # 写入文件
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(content_lines))
+            _write_text_file(filepath, '\n'.join(content_lines))
 
             return True
 
@@ -434,13 +605,13 @@ class DataSyncManager:
             print(f"✗ 保存失败 {video_info.get('bv', 'unknown')}: {e}")
             return False
 
-    def update_sync_record(self, media_id: int, all_synced_bvs: List[str]) -> bool:
+    def update_sync_record(self, media_id: int, all_synced_bvs: Collection[str]) -> bool:
         """
         更新同步记录
 
         Args:
             media_id: 收藏夹ID
-            all_synced_bvs: 所有已同步的BV号列表
+            all_synced_bvs: 所有已同步的BV号集合（列表或集合均可）
 
         Returns:
             是否更新成功
@@ -455,13 +626,13 @@ class DataSyncManager:
             record_data = {
                 'media_id': media_id,
                 'sync_time': datetime.now().isoformat(),
-                'synced_bvs': sorted(all_synced_bvs),
+                # 读取时会转换为集合，顺序无关紧要，按传入顺序（收藏夹顺序）写出，省去排序
+                'synced_bvs': list(all_synced_bvs),
                 'total_count': len(all_synced_bvs)
             }
 
             # 写入记录文件
-            with open(record_path, 'w', encoding='utf-8') as f:
-                json.dump(record_data, f, ensure_ascii=False, indent=2)
+            dump_json_file(record_data, record_path, sort_keys=True)
 
             print(f"✓ 同步记录已更新: {record_path}")
             return True
@@ -470,42 +641,71 @@ class DataSyncManager:
             print(f"✗ 更新同步记录失败: {e}")
             return False
 
-    def save_to_markdown_threads(self, video_info_list: List[Dict]) -> Tuple[int, List[str]]:
+    def fetch_subtitles(self, video_info_list: List[Dict]) -> List[str]:
         """
-        使用线程池并发保存视频信息为Markdown文件
+        在写入Markdown之前获取所有视频的字幕内容
+
+        字幕获取需要访问网络，启用 step5_use_threads 时使用线程池并发请求，
+        并发数由 step5_max_workers 限制，避免触发接口限流。
 
         Args:
             video_info_list: 视频信息列表
 
         Returns:
-            (成功数量, 失败的BV号列表)
+            与 video_info_list 一一对应的字幕内容列表
+        """
+        if self.step5_use_threads:
+            # 并发执行，executor.map 保持结果与输入顺序一致
+            print(f"使用并发模式 (max_workers={self.step5_max_workers})")
+            with ThreadPoolExecutor(max_workers=self.step5_max_workers) as executor:
+                return list(tqdm(
+                    executor.map(self.extract_subtitle_content, video_info_list),
+                    total=len(video_info_list), desc="步骤5 获取字幕(并发)", unit="视频"
+                ))
+
+        # 串行执行
+        print("使用串行模式")
+        return [
+            self.extract_subtitle_content(video_info)
+            for video_info in tqdm(video_info_list, desc="步骤5 获取字幕", unit="视频")
+        ]
+
+    def save_batch(
+        self,
+        video_info_list: List[Dict],
+        media_id: int,
+        all_synced_bvs: Collection[str],
+    ) -> Tuple[int, List[str], bool]:
+        """
+        一次性完成Markdown批量保存与同步记录更新
+
+        先根据 step5_use_threads 以并发或串行方式获取全部字幕，再依次写入Markdown文件，
+        全部保存结束后只写入一次同步记录。
+
+        Args:
+            video_info_list: 待保存的视频信息列表
+            media_id: 收藏夹ID
+            all_synced_bvs: 保存完成后记为已同步的BV号集合
+
+        Returns:
+            (成功数量, 失败的BV号列表, 同步记录是否更新成功)
         """
+        # 先统一分配文件路径，保存阶段不再需要逐个加锁检查冲突
+        filepaths = self.allocate_filepaths(video_info_list)
+
+        # 网络请求集中在字幕获取阶段完成，写文件只剩本地磁盘操作
+        subtitles = self.fetch_subtitles(video_info_list)
+
         success_count = 0
         failed_bvs = []
+        for video_info, filepath, subtitle_content in zip(video_info_list, filepaths, subtitles):
+            if self.save_to_markdown(video_info, filepath, subtitle_content):
+                success_count += 1
+            else:
+                failed_bvs.append(video_info.get('bv', 'unknown'))
 
-        with ThreadPoolExecutor(max_workers=self.step5_max_workers) as executor:
-            # 提交所有任务
-            future_to_bv = {
-                executor.submit(self.save_to_markdown, video_info): video_info.get('bv', 'unknown')
-                for video_info in video_info_list
-            }
-
-            # 使用 tqdm 进度条
-            with tqdm(total=len(video_info_list), desc="步骤5 保存Markdown(并发)", unit="视频") as pbar:
-                for future in as_completed(future_to_bv):
-                    bv = future_to_bv[future]
-                    try:
-                        if future.result():
-                            success_count += 1
-                        else:
-                            failed_bvs.append(bv)
-                    except Exception as e:
-                        print(f"  警告：处理 {bv} 时发生异常: {e}")
-                        failed_bvs.append(bv)
-                    finally:
-                        pbar.update(1)
-
-        return success_count, failed_bvs
+        record_updated = self.update_sync_record(media_id, all_synced_bvs)
+        return success_count, failed_bvs, record_updated
 
     def sync_data(self, json_file: str, media_id: int) -> bool:
         """
@@ -522,8 +722,9 @@ class DataSyncManager:
         print(f"数据源文件: {json_file}")
         print("-" * 50)
 
-        # 步骤1: 提取原始视频列表
-        current_bvs = self.extract_video_list(json_file)
+        # 步骤1: 读取数据文件（只解析一次）并建立BV索引，供步骤1与步骤4共用
+        bv_index = self.build_bv_index(self.load_video_data(json_file))
+        current_bvs = self.extract_video_list(bv_index)
         if not current_bvs:
             print("未找到有效视频数据，同步终止")
             return False
@@ -539,37 +740,25 @@ class DataSyncManager:
             return True
 
         # 步骤4: 提取目标视频信息
-        video_info_list = self.extract_video_info(json_file, target_bvs)
+        video_info_list = self.extract_video_info(bv_index, target_bvs)
         if not video_info_list:
             print("未能提取到有效视频信息，同步终止")
             return False
 
-        # 步骤5: 筛选核心信息并保存为Markdown（字幕获取在 save_to_markdown 内部自动完成）
+        # 步骤5: 获取字幕，筛选核心信息并保存为Markdown（字幕在写入前由 save_batch 统一获取）
         print(f"\n步骤5: 开始保存 {len(video_info_list)} 个视频的Markdown文件...")
 
-        if self.step5_use_threads:
-            # 并发执行
-            print(f"使用并发模式 (max_workers={self.step5_max_workers})")
-            success_count, failed_bvs = self.save_to_markdown_threads(video_info_list)
-        else:
-            # 串行执行
-            print("使用串行模式")
-            success_count = 0
-            failed_bvs = []
-            for video_info in tqdm(video_info_list, desc="步骤5 保存Markdown", unit="视频"):
-                if self.save_to_markdown(video_info):
-                    success_count += 1
-                else:
-                    failed_bvs.append(video_info.get('bv', 'unknown'))
+        # 步骤7: 更新同步记录（与步骤5在同一次批量调用中完成），所有当前视频都算作已同步
+        success_count, failed_bvs, record_updated = self.save_batch(
+            video_info_list, media_id, current_bvs
+        )
 
         failed_count = len(failed_bvs)
         failed_bvs_display = ", ".join(failed_bvs) if failed_bvs else "无"
         print(f"成功保存: {success_count}/{len(video_info_list)} 个文件")
         print(f"失败数量: {failed_count}，失败BV: {failed_bvs_display}")
 
-        # 步骤7: 更新同步记录
-        all_synced_bvs = list(set(current_bvs))  # 所有当前视频都算作已同步
-        if self.update_sync_record(media_id, all_synced_bvs):
+        if record_updated:
             print("-" * 50)
             print("✓ 数据同步完成!")
             return True
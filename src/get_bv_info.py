@@ -18,18 +18,44 @@
 """
 
 import sys
-import json
-import os
+import argparse
+import operator
 import time
 import random
 from datetime import datetime
+from pathlib import Path
 from typing import List, Dict, Union, Optional
 
+from common import dump_json_file, BatchFetcher
+
 # 导入biliVideo类
 from Tools.bili_tools import biliVideo
 
-
-class BVInfoExtractor:
+# 结果文件的输出目录
+_OUTPUT_DIR = Path("output")
+
+# 结果中直接取自biliVideo实例属性的字段，顺序即输出JSON中的键顺序
+_VIDEO_FIELDS = (
+    # 基本信息
+    "bv", "av", "cid", "url_bv",
+    # 视频信息
+    "title", "pic", "desc", "time", "tid", "tname", "duration",
+    # 统计数据
+    "stat", "view", "dm", "reply", "like", "coin", "fav", "share",
+    # 标签信息
+    "tag",
+    # 字幕信息
+    "subtitle",
+    # UP主信息
+    "up", "up_mid", "up_follow", "up_followers",
+    # 用户互动信息
+    "user_like", "user_coin", "user_fav",
+)
+# 一次调用取出全部字段的值
+_get_video_fields = operator.attrgetter(*_VIDEO_FIELDS)
+
+
+class BVInfoExtractor(BatchFetcher):
     """BV视频信息提取器"""
 
     def __init__(self, cookie_path: Optional[str] = None):
@@ -39,19 +65,24 @@ class BVInfoExtractor:
         Args:
             cookie_path: cookie文件路径，默认为None使用默认路径
         """
+        super().__init__()
         self.cookie_path = cookie_path
         self.results = []
 
-    def get_single_video_info(self, bv_id: str) -> Dict:
+    def get_single_video_info(self, bv_id: str, fetch_time: Optional[str] = None) -> Dict:
         """
         获取单个视频的完整信息
 
         Args:
             bv_id: BV号
+            fetch_time: 获取时间（ISO格式），批量获取时由调用方统一传入；为None时取当前时间
 
         Returns:
             包含视频信息的字典
         """
+        if fetch_time is None:
+            fetch_time = datetime.now().isoformat()
+
         print(f"正在获取 {bv_id} 的信息...")
 
         try:
@@ -72,56 +103,12 @@ class BVInfoExtractor:
                 video.user_fav = None
 
             # 构建信息字典
-            video_info = {
-                # 基本信息
-                "bv": video.bv,
-                "av": video.av,
-                "cid": video.cid,
-                "url_bv": video.url_bv,
-
-                # 视频信息
-                "title": video.title,
-                "pic": video.pic,
-                "desc": video.desc,
-                "time": video.time,
-                "tid": video.tid,
-                "tname": video.tname,
-                "duration": video.duration,
-
-                # 统计数据
-                "stat": video.stat,
-                "view": video.view,
-                "dm": video.dm,
-                "reply": video.reply,
-                "like": video.like,
-                "coin": video.coin,
-                "fav": video.fav,
-                "share": video.share,
-
-                # 标签信息
-                "tag": video.tag,
-
-                # 字幕信息
-                "subtitle": video.subtitle,
-
-                # UP主信息
-                "up": video.up,
-                "up_mid": video.up_mid,
-                "up_follow": video.up_follow,
-                "up_followers": video.up_followers,
-
-                # 用户互动信息
-                "user_like": video.user_like,
-                "user_coin": video.user_coin,
-                "user_fav": video.user_fav,
-
-                # 获取时间
-                "fetch_time": datetime.now().isoformat(),
-
-                # 状态信息
-                "success": True,
-                "error": None
-            }
+            video_info = dict(zip(_VIDEO_FIELDS, _get_video_fields(video)))
+            # 获取时间
+            video_info["fetch_time"] = fetch_time
+            # 状态信息
+            video_info["success"] = True
+            video_info["error"] = None
 
             print(f"✓ {bv_id} 信息获取成功: {video.title}")
             return video_info
@@ -131,24 +118,36 @@ class BVInfoExtractor:
                 "bv": bv_id,
                 "success": False,
                 "error": str(e),
-                "fetch_time": datetime.now().isoformat()
+                "fetch_time": fetch_time
             }
             print(f"✗ {bv_id} 信息获取失败: {e}")
             return error_info
 
-    def get_batch_video_info(self, bv_list: List[str], delay: float = 1.0) -> List[Dict]:
+    def get_batch_video_info(
+        self,
+        bv_list: List[str],
+        delay: float = 1.0,
+        min_delay: Optional[float] = None,
+    ) -> List[Dict]:
         """
         批量获取视频信息
 
         Args:
             bv_list: BV号列表
             delay: 请求间隔时间（秒），默认为1秒
+            min_delay: 自适应间隔的下限（秒）。为None时始终使用固定的delay；
+                指定后每次成功将间隔减半直至该下限，失败（如触发412/429风控）
+                时间隔翻倍退避，最多不超过初始的delay
 
         Returns:
             视频信息列表
         """
         results = []
         total = len(bv_list)
+        current_delay = delay
+        # 本批次所有视频信息记录同一个 fetch_time，便于按批次对照同步记录
+        batch_fetch_time = datetime.now().isoformat()
+        self._reset_counts()
 
         print(f"开始批量获取 {total} 个视频的信息...")
 
@@ -156,16 +155,57 @@ class BVInfoExtractor:
             print(f"[{i}/{total}] ", end="")
 
             # 获取单个视频信息
-            video_info = self.get_single_video_info(bv_id)
+            video_info = self._tally_result(self.get_single_video_info(bv_id, fetch_time=batch_fetch_time))
             results.append(video_info)
+            succeeded = video_info.get('success', False)
+
+            # 自适应调整请求间隔：成功则减半，失败则翻倍退避
+            if min_delay is not None:
+                if succeeded:
+                    current_delay = max(min_delay, current_delay / 2)
+                else:
+                    current_delay = min(delay, current_delay * 2)
 
             # 添加随机延迟避免请求过快
             if i < total:  # 最后一个不需要延迟
-                sleep_time = delay + random.uniform(0, 0.5)
+                sleep_time = current_delay + random.uniform(0, 0.5)
                 time.sleep(sleep_time)
 
-        print(f"批量获取完成，成功: {sum(1 for r in results if r.get('success', False))}，"
-              f"失败: {sum(1 for r in results if not r.get('success', True))}")
+        print(f"批量获取完成，成功: {self.last_success_count}，失败: {self.last_fail_count}")
+
+        return results
+
+    def get_batch_video_info_concurrent(
+        self,
+        bv_list: List[str],
+        max_workers: int = 2,
+        min_interval: float = 1.0,
+    ) -> List[Dict]:
+        """
+        使用线程池并发批量获取视频信息
+
+        每个视频需要调用多个B站接口，相邻两个视频的开始时间仍按与串行获取相当的间隔错开，
+        并发只用于重叠单个视频的接口耗时，不会提高请求频率上限。
+
+        Args:
+            bv_list: BV号列表
+            max_workers: 最大并发线程数，默认为2
+            min_interval: 相邻两个视频开始获取的最小间隔（秒），默认为1秒
+
+        Returns:
+            视频信息列表，顺序与 bv_list 一致
+        """
+        print(f"开始并发获取 {len(bv_list)} 个视频的信息 (max_workers={max_workers})...")
+        # 与串行获取一致，并发完成的先后不影响各视频记录的 fetch_time
+        batch_fetch_time = datetime.now().isoformat()
+        self._reset_counts()
+
+        def fetch(bv_id: str) -> Dict:
+            return self.get_single_video_info(bv_id, fetch_time=batch_fetch_time)
+
+        results = list(self._iter_concurrent(fetch, bv_list, max_workers, min_interval))
+
+        print(f"批量获取完成，成功: {self.last_success_count}，失败: {self.last_fail_count}")
 
         return results
 
@@ -180,10 +220,8 @@ class BVInfoExtractor:
         Returns:
             保存的文件路径
         """
-        # 确保output文件夹存在
-        output_dir = "output"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        # 确保output文件夹存在（exist_ok 一次调用完成，并发写入时也不会因目录已存在而报错）
+        _OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
         # 生成文件名
         if filename is None:
@@ -193,11 +231,10 @@ class BVInfoExtractor:
         if not filename.endswith('.json'):
             filename += '.json'
 
-        file_path = os.path.join(output_dir, filename)
+        file_path = str(_OUTPUT_DIR / filename)
 
-        # 保存结果
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        # 保存结果（直接输出 UTF-8 字节，中文标题无需转义）
+        dump_json_file(results, file_path)
 
         print(f"结果已保存到: {file_path}")
         return file_path
@@ -212,14 +249,11 @@ class BVInfoExtractor:
         Returns:
             BV号列表
         """
-        bv_list = []
-
         try:
+            # 一次性读入后在列表推导式中过滤（文本模式已将 \r\n、\r 统一为 \n，按 \n 切分与逐行迭代一致）
             with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and line.startswith('BV'):
-                        bv_list.append(line)
+                lines = f.read().split('\n')
+            bv_list = [line for line in map(str.strip, lines) if line.startswith('BV')]
 
             print(f"从文件 {file_path} 中读取到 {len(bv_list)} 个BV号")
             return bv_list
@@ -231,67 +265,57 @@ class BVInfoExtractor:
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(
+        description='获取B站视频的基本属性和视频信息，结果以JSON格式保存到output文件夹',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+使用示例:
+  python get_bv_info.py BV1ov42117yC
+  python get_bv_info.py BV1ov42117yC BV1YS421d7Yx
+  python get_bv_info.py --file bv_list.txt
+  python get_bv_info.py --cookie cookie/qr_login.txt BV1ov42117yC
+  python get_bv_info.py --workers 4 --file bv_list.txt
+        """
+    )
+
+    parser.add_argument('bvs', nargs='*', metavar='BV', help='BV号，可指定多个')
+    parser.add_argument('--file', type=str, metavar='PATH',
+                       help='从文件中读取BV号列表（每行一个）')
+    parser.add_argument('--cookie', type=str, metavar='PATH',
+                       help='指定cookie文件路径（可选）')
+    parser.add_argument('--output', type=str, metavar='FILENAME',
+                       help='输出文件名（可选）')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                       help='并发线程数，大于1时并发获取 (默认: 1)')
+    parser.add_argument('--delay', type=float, default=1.0, metavar='SECONDS',
+                       help='串行批量获取时的请求间隔（秒） (默认: 1.0)')
 
-    # 创建信息提取器
-    extractor = BVInfoExtractor()
-
-    # 解析命令行参数
     if len(sys.argv) < 2:
-        print("使用方法:")
-        print("  python get_bv_info.py BV1ov42117yC")
-        print("  python get_bv_info.py BV1ov42117yC BV1YS421d7Yx")
-        print("  python get_bv_info.py --file bv_list.txt")
-        print("  python get_bv_info.py --cookie cookie/qr_login.txt BV1ov42117yC")
+        parser.print_help()
         sys.exit(1)
 
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers 参数需要指定正整数线程数")
+
+    # 在解析完参数后创建信息提取器，cookie路径在初始化时就已确定
+    extractor = BVInfoExtractor(cookie_path=args.cookie)
+
+    # 直接的BV号参数与文件中读取的BV号合并
     bv_list = []
-    cookie_path = None
-    output_filename = None
-
-    # 解析参数
-    i = 1
-    while i < len(sys.argv):
-        arg = sys.argv[i]
-
-        if arg == '--file':
-            if i + 1 < len(sys.argv):
-                file_path = sys.argv[i + 1]
-                bv_list = extractor.read_bv_list_from_file(file_path)
-                i += 2
-            else:
-                print("--file 参数需要指定文件路径")
-                sys.exit(1)
-        elif arg == '--cookie':
-            if i + 1 < len(sys.argv):
-                cookie_path = sys.argv[i + 1]
-                extractor.cookie_path = cookie_path
-                i += 2
-            else:
-                print("--cookie 参数需要指定cookie路径")
-                sys.exit(1)
-        elif arg == '--output':
-            if i + 1 < len(sys.argv):
-                output_filename = sys.argv[i + 1]
-                i += 2
-            else:
-                print("--output 参数需要指定输出文件名")
-                sys.exit(1)
+    for arg in args.bvs:
+        if arg.startswith('BV'):
+            bv_list.append(arg)
         else:
-            # 直接的BV号参数
-            if arg.startswith('BV'):
-                bv_list.append(arg)
-            else:
-                print(f"无效的BV号: {arg}")
-            i += 1
+            print(f"无效的BV号: {arg}")
+    if args.file:
+        bv_list.extend(extractor.read_bv_list_from_file(args.file))
 
     if not bv_list:
         print("未指定有效的BV号")
         sys.exit(1)
 
-    # 设置cookie路径
-    if cookie_path:
-        extractor.cookie_path = cookie_path
-
     print(f"准备获取 {len(bv_list)} 个视频的信息")
     print(f"Cookie路径: {extractor.cookie_path or '默认路径'}")
     print("-" * 50)
@@ -300,15 +324,20 @@ def main():
     if len(bv_list) == 1:
         # 单个视频
         results = [extractor.get_single_video_info(bv_list[0])]
+        success_count = 1 if results[0].get('success', False) else 0
+    elif args.workers > 1:
+        # 并发批量获取
+        results = extractor.get_batch_video_info_concurrent(bv_list, max_workers=args.workers)
+        success_count = extractor.last_success_count
     else:
         # 批量获取
-        results = extractor.get_batch_video_info(bv_list, delay=1.0)
+        results = extractor.get_batch_video_info(bv_list, delay=args.delay)
+        success_count = extractor.last_success_count
 
     # 保存结果
-    output_path = extractor.save_results_to_json(results, output_filename)
+    output_path = extractor.save_results_to_json(results, args.output)
 
     # 输出统计信息
-    success_count = sum(1 for r in results if r.get('success', False))
     fail_count = len(results) - success_count
 
     print("-" * 50)
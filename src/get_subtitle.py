@@ -17,19 +17,95 @@
 """
 
 import sys
+import functools
+import hashlib
 import json
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import random
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Union, Optional
+from pathlib import Path
+from typing import List, Dict, Union, Optional, Iterator, Tuple
+from tqdm import tqdm
+
+from common import loads_json, dumps_json_line, load_json_file, dump_json_file, atomic_write_bytes, BatchFetcher
 
 from Tools.config import useragent
 from Tools.config import bilicookies
 
+# 重新排版为可选功能，模块不可用时跳过排版
+try:
+    from reformat_subtitle import SubtitleReformatter
+except ImportError:
+    SubtitleReformatter = None
+
+_USER_AGENT = useragent().pcChrome
+
+# 结果文件的输出目录与字幕内容的默认磁盘缓存目录
+_OUTPUT_DIR = Path("output")
+DEFAULT_SUBTITLE_CACHE_DIR = str(_OUTPUT_DIR / ".subtitle_cache")
+
+
+def jsonl_to_json(jsonl_path: str, json_path: Optional[str] = None) -> str:
+    """
+    将 JSON Lines 字幕结果转换为与 save_results_to_json 相同格式的JSON文件
+
+    Args:
+        jsonl_path: JSON Lines 文件路径
+        json_path: 输出的JSON文件路径，为None时与输入同名（扩展名改为 .json）
+
+    Returns:
+        输出文件路径
+    """
+    if json_path is None:
+        json_path = str(Path(jsonl_path).with_suffix('.json'))
+
+    with open(jsonl_path, 'rb') as f:
+        results = [loads_json(line) for line in f if line.strip()]
+
+    dump_json_file(results, json_path)
+    return json_path
+
 
-class SubtitleExtractor:
+@functools.lru_cache(maxsize=8)
+def _read_cookie(cookie_path: str, mtime_ns: int) -> str:
+    """
+    读取cookie文件内容，同一进程内按 (文件路径, 修改时间) 缓存
+
+    Args:
+        cookie_path: cookie文件路径
+        mtime_ns: cookie文件的修改时间（纳秒），用作缓存键，文件更新后自动重新读取
+
+    Returns:
+        cookie字符串
+    """
+    return bilicookies(path=cookie_path).bilicookie
+
+
+def _load_cookie(cookie_path: str) -> str:
+    """
+    获取cookie字符串，cookie文件未变化时直接返回缓存结果
+
+    Args:
+        cookie_path: cookie文件路径
+
+    Returns:
+        cookie字符串
+    """
+    try:
+        mtime_ns = os.stat(cookie_path).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError("Cookie 文件不存在: {}".format(cookie_path))
+    return _read_cookie(cookie_path, mtime_ns)
+
+
+class SubtitleExtractor(BatchFetcher):
     """字幕提取器"""
 
     def __init__(
@@ -42,6 +118,8 @@ class SubtitleExtractor:
         llm_timeout_sec: int = 40,
         max_original_subtitle_chars: int = 8000,
         max_video_duration_sec: int = 1800,
+        cache_dir: Optional[str] = None,
+        llm_rps: Optional[float] = 5.0,
     ):
         """
         初始化字幕提取器
@@ -52,19 +130,37 @@ class SubtitleExtractor:
             api_key: 大模型 API 密钥，默认为None
             model: 大模型名称，默认为None
             base_url: 大模型 API 基础地址，默认为None
+            cache_dir: 字幕内容的磁盘缓存目录，默认为None不使用缓存
+            llm_rps: 重新排版时每秒最多发起的大模型请求数，默认为5；为None时不限速
         """
+        super().__init__()
         self.cookie_path = cookie_path
+        self.cache_dir = Path(cache_dir) if cache_dir else None
         if cookie_path is None:
             from Tools.config import Config
             config = Config()
             cookie_path = config.LOGIN_COOKIE_PATH
         
         self.headers = {
-            "User-Agent": useragent().pcChrome,
-            "Cookie": bilicookies(path=cookie_path).bilicookie,
+            "User-Agent": _USER_AGENT,
+            "Cookie": _load_cookie(cookie_path),
             'referer': 'https://www.bilibili.com'
         }
 
+        # 复用同一个会话的连接池，避免每次获取字幕都重新建立 TCP/TLS 连接；
+        # 对限流与服务端错误自动退避重试
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
         self.reformat = reformat
         self.api_key = api_key
         self.model = model
@@ -72,6 +168,47 @@ class SubtitleExtractor:
         self.llm_timeout_sec = llm_timeout_sec
         self.max_original_subtitle_chars = max_original_subtitle_chars
         self.max_video_duration_sec = max_video_duration_sec
+        self.llm_rps = llm_rps
+
+        # 重新排版器在首次需要排版时创建，之后所有视频共用；并发获取时由锁保证只创建一个实例
+        self._reformatter = None
+        self._reformatter_lock = threading.Lock()
+
+    def close(self) -> None:
+        """关闭复用的 HTTP 会话"""
+        self.session.close()
+        # 共用的重新排版器同样持有会话
+        if self._reformatter is not None:
+            self._reformatter.close()
+
+    def __enter__(self):
+        """支持 with 语句，退出时自动关闭会话"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """退出 with 语句时关闭会话"""
+        self.close()
+
+    def _get_reformatter(self) -> "SubtitleReformatter":
+        """
+        获取共用的重新排版器，首次调用时创建（线程安全）
+
+        创建失败（如未配置 API Key）时抛出异常且不缓存，下次调用会重新尝试
+
+        Returns:
+            SubtitleReformatter 实例
+        """
+        if self._reformatter is None:
+            with self._reformatter_lock:
+                if self._reformatter is None:
+                    self._reformatter = SubtitleReformatter(
+                        api_key=self.api_key,
+                        model=self.model,
+                        base_url=self.base_url,
+                        llm_timeout_sec=self.llm_timeout_sec,
+                        requests_per_second=self.llm_rps,
+                    )
+        return self._reformatter
 
     def _select_subtitles(self, subtitles: List[Dict]) -> List[Dict]:
         """
@@ -83,26 +220,54 @@ class SubtitleExtractor:
         Returns:
             选中的字幕列表
         """
-        # 优先检查原声字幕（非ai开头）
-        original_subtitles = [
-            sub for sub in subtitles 
-            if sub.get('lan', '') and not sub.get('lan', '').startswith('ai-')
-        ]
-        
-        if original_subtitles:
-            return original_subtitles
-        
-        # 如果没有原声字幕，检查ai-zh字幕
-        ai_zh_subtitles = [
-            sub for sub in subtitles 
-            if sub.get('lan', '') == 'ai-zh'
-        ]
-        
-        if ai_zh_subtitles:
-            return ai_zh_subtitles
+        # 单次遍历同时收集原声字幕（非ai开头）与ai-zh字幕
+        original_subtitles = []
+        ai_zh_subtitles = []
+        for sub in subtitles:
+            lan = sub.get('lan') or ''
+            if not lan:
+                continue
+            if lan.startswith('ai-'):
+                if lan == 'ai-zh':
+                    ai_zh_subtitles.append(sub)
+            else:
+                original_subtitles.append(sub)
         
-        # 如果都没有，返回空列表（表示错误）
-        return []
+        # 优先返回原声字幕，其次ai-zh字幕；都没有时返回空列表（表示错误）
+        return original_subtitles or ai_zh_subtitles
+
+    def _subtitle_cache_path(self, subtitle_url: str) -> Optional[Path]:
+        """
+        计算字幕URL对应的缓存文件路径
+
+        Args:
+            subtitle_url: 完整的字幕URL
+
+        Returns:
+            缓存文件路径，未启用缓存时返回None
+        """
+        if self.cache_dir is None:
+            return None
+        # 字幕URL带有会过期的签名参数，只用主机名与路径作为缓存键
+        parts = urllib.parse.urlsplit(subtitle_url)
+        key = hashlib.sha1(f"{parts.netloc}{parts.path}".encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def _write_subtitle_cache(self, cache_path: Path, content: bytes) -> None:
+        """
+        原子写入字幕缓存文件
+
+        Args:
+            cache_path: 缓存文件路径
+            content: 字幕接口返回的原始字节
+        """
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # 原子写入，避免并发读取到写了一半的缓存
+            atomic_write_bytes(cache_path, content)
+        except OSError:
+            # 缓存只是加速手段，写入失败不影响字幕获取
+            pass
 
     def _fetch_subtitle_content(self, subtitle_url: str) -> Optional[Dict]:
         """
@@ -119,17 +284,46 @@ class SubtitleExtractor:
             if subtitle_url.startswith('//'):
                 subtitle_url = 'https:' + subtitle_url
             
-            response = requests.get(subtitle_url, headers=self.headers, timeout=10)
+            # 同一URL的字幕内容不会变化，命中磁盘缓存时省去请求与下载
+            cache_path = self._subtitle_cache_path(subtitle_url)
+            if cache_path is not None:
+                try:
+                    return loads_json(cache_path.read_bytes())
+                except (OSError, ValueError):
+                    # 缓存不存在或已损坏，重新下载
+                    pass
+            
+            response = self.session.get(subtitle_url, timeout=10)
             response.raise_for_status()
             
-            # 解析JSON内容
-            subtitle_content = response.json()
+            # 解析JSON内容（有 orjson 时直接解析响应字节）
+            subtitle_content = loads_json(response.content)
+            if cache_path is not None:
+                self._write_subtitle_cache(cache_path, response.content)
             return subtitle_content
             
         except Exception as e:
             print(f"获取字幕内容失败: {e}")
             return None
 
+    def _fetch_many(self, subtitle_urls: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        并发获取多条字幕的内容，相同的URL只请求一次
+
+        Args:
+            subtitle_urls: 字幕URL列表
+
+        Returns:
+            URL到字幕内容的字典，获取失败的URL对应None
+        """
+        unique_urls = list(dict.fromkeys(url for url in subtitle_urls if url))
+        if len(unique_urls) <= 1:
+            return {url: self._fetch_subtitle_content(url) for url in unique_urls}
+
+        # 同一视频的字幕轨道数量很少，共用会话的连接池并发请求即可
+        with ThreadPoolExecutor(max_workers=min(len(unique_urls), 4)) as executor:
+            return dict(zip(unique_urls, executor.map(self._fetch_subtitle_content, unique_urls)))
+
     def extract_subtitle_text(self, subtitle_content: Dict) -> str:
         """
         将字幕回复体转换为字幕全文
@@ -151,25 +345,25 @@ class SubtitleExtractor:
         if not isinstance(body, list):
             return ""
         
-        # 提取所有content字段并拼接
-        content_list = []
-        for item in body:
-            if isinstance(item, dict):
-                content = item.get('content', '')
-                if content:
-                    content_list.append(content)
-        
-        # 拼接所有content
-        full_text = ''.join(content_list)
-        return full_text
+        # 提取所有非空的content字段并一次性拼接（列表推导式比逐个 append 少一次方法调用开销）
+        return ''.join([
+            content for item in body
+            if isinstance(item, dict) and (content := item.get('content'))
+        ])
 
-    def get_video_subtitles(self, video_info: Dict, reformat: bool = False) -> Dict:
+    def get_video_subtitles(
+        self,
+        video_info: Dict,
+        reformat: bool = False,
+        fetch_time: Optional[str] = None,
+    ) -> Dict:
         """
         获取单个视频的字幕
 
         Args:
             video_info: 视频信息字典
             reformat: 是否对字幕进行重新排版，默认为False
+            fetch_time: 获取时间（ISO格式），批量获取时由调用方统一传入；为None时取当前时间
 
         Returns:
             包含字幕信息的字典，如果reformat=True，每个字幕会包含reformatted_content字段
@@ -177,6 +371,8 @@ class SubtitleExtractor:
         bv = video_info.get('bv', 'Unknown')
         title = video_info.get('title', 'Unknown')
         duration = video_info.get('duration')
+        if fetch_time is None:
+            fetch_time = datetime.now().isoformat()
 
         # 获取字幕信息
         subtitle_info = video_info.get('subtitle', {})
@@ -191,7 +387,7 @@ class SubtitleExtractor:
                 "success": False,
                 "error": error_msg,
                 "subtitles": [],
-                "fetch_time": datetime.now().isoformat()
+                "fetch_time": fetch_time
             }
 
         # 根据优先级选择字幕
@@ -206,9 +402,18 @@ class SubtitleExtractor:
                 "success": False,
                 "error": error_msg,
                 "subtitles": [],
-                "fetch_time": datetime.now().isoformat()
+                "fetch_time": fetch_time
             }
 
+        # 一次性并发获取所有选中字幕的内容，排版前的字数检查与后续处理共用结果
+        subtitle_contents = self._fetch_many([sub.get('subtitle_url', '') for sub in selected_subtitles])
+        # 每条字幕只拼接一次全文，字数检查与结果构建共用
+        subtitle_texts = {
+            url: self.extract_subtitle_text(content)
+            for url, content in subtitle_contents.items()
+            if content
+        }
+
         # T5: 字幕排版范围限定 - 检查是否应跳过排版
         skip_reformat_reason = None
         if reformat:
@@ -222,9 +427,9 @@ class SubtitleExtractor:
                 # 先获取字幕内容以计算字数
                 temp_subtitle_url = original_subtitles[0].get('subtitle_url', '')
                 if temp_subtitle_url:
-                    temp_content = self._fetch_subtitle_content(temp_subtitle_url)
-                    if temp_content:
-                        subtitle_char_count = len(self.extract_subtitle_text(temp_content))
+                    temp_text = subtitle_texts.get(temp_subtitle_url)
+                    if temp_text is not None:
+                        subtitle_char_count = len(temp_text)
                         if subtitle_char_count > self.max_original_subtitle_chars:
                             skip_reformat_reason = f"字幕字数({subtitle_char_count})超过阈值({self.max_original_subtitle_chars})"
 
@@ -237,70 +442,44 @@ class SubtitleExtractor:
                 reformat = False
                 print(f"  ℹ {bv} 跳过字幕排版: {skip_reformat_reason}")
 
-        # 如果需要重新排版，初始化重新排版器
+        # 如果需要重新排版，获取共用的重新排版器
         reformatter = None
         if reformat:
-            try:
-                from reformat_subtitle import SubtitleReformatter
-                reformatter = SubtitleReformatter(
-                    api_key=self.api_key,
-                    model=self.model,
-                    base_url=self.base_url,
-                    llm_timeout_sec=self.llm_timeout_sec,
-                )
-            except ImportError:
+            if SubtitleReformatter is None:
                 print("  警告：无法导入 reformat_subtitle 模块，跳过重新排版")
                 reformat = False
-            except Exception as e:
-                print(f"  警告：初始化重新排版器失败: {e}，跳过重新排版")
-                reformat = False
+            else:
+                try:
+                    reformatter = self._get_reformatter()
+                except Exception as e:
+                    print(f"  警告：初始化重新排版器失败: {e}，跳过重新排版")
+                    reformat = False
         
         # 获取所有选中字幕的内容
         subtitle_results = []
         for sub in selected_subtitles:
-            lan = sub.get('lan', '')
-            lan_doc = sub.get('lan_doc', '')
             subtitle_url = sub.get('subtitle_url', '')
+            subtitle_text = subtitle_texts.get(subtitle_url)
             
-            subtitle_content = self._fetch_subtitle_content(subtitle_url)
-            
-            if subtitle_content:
+            if subtitle_text is not None:
                 # 提取字幕全文
-                subtitle_text = self.extract_subtitle_text(subtitle_content)
-                subtitle_item = {
-                    "lan": lan,
-                    "lan_doc": lan_doc,
+                subtitle_results.append({
+                    "lan": sub.get('lan', ''),
+                    "lan_doc": sub.get('lan_doc', ''),
                     "subtitle_url": subtitle_url,
-                    "content": subtitle_text
-                }
-                
-                # 如果需要重新排版，调用重新排版功能
-                if reformat and reformatter:
-                    try:
-                        # 构造临时数据结构用于重新排版
-                        temp_subtitle_data = {
-                            "title": title,
-                            "subtitles": [{
-                                "lan": lan,
-                                "content": subtitle_text
-                            }]
-                        }
-                        # 调用重新排版
-                        reformatted_data = reformatter.reformat_subtitle_content(temp_subtitle_data)
-                        # 提取重新排版后的内容
-                        if reformatted_data.get('subtitles') and len(reformatted_data['subtitles']) > 0:
-                            reformatted_content = reformatted_data['subtitles'][0].get('reformatted_content', '')
-                            subtitle_item['reformatted_content'] = reformatted_content
-                        else:
-                            subtitle_item['reformatted_content'] = ''
-                    except Exception as e:
-                        print(f"  警告：{bv} {lan} 字幕重新排版失败: {e}")
-                        subtitle_item['reformatted_content'] = ''
-                else:
+                    "content": subtitle_text,
                     # 如果不需要重新排版，reformatted_content 字段为空
-                    subtitle_item['reformatted_content'] = ''
-                
-                subtitle_results.append(subtitle_item)
+                    "reformatted_content": ''
+                })
+        
+        # 如果需要重新排版，一次性提交该视频的所有字幕，由重新排版器并发调用大模型
+        if reformat and reformatter and subtitle_results:
+            reformatted_contents = reformatter.reformat_many([
+                {"bv": bv, "title": title, "lan": item["lan"], "content": item["content"]}
+                for item in subtitle_results
+            ])
+            for item, reformatted_content in zip(subtitle_results, reformatted_contents):
+                item['reformatted_content'] = reformatted_content
         
         if not subtitle_results:
             error_msg = f"{bv} 字幕内容获取失败"
@@ -311,7 +490,7 @@ class SubtitleExtractor:
                 "success": False,
                 "error": error_msg,
                 "subtitles": [],
-                "fetch_time": datetime.now().isoformat()
+                "fetch_time": fetch_time
             }
         
         return {
@@ -320,76 +499,178 @@ class SubtitleExtractor:
             "success": True,
             "error": None,
             "subtitles": subtitle_results,
-            "fetch_time": datetime.now().isoformat()
+            "fetch_time": fetch_time
         }
 
-    def get_batch_subtitles(self, video_info_list: List[Dict], delay: float = 1.0, reformat: bool = False) -> List[Dict]:
+    def iter_batch_subtitles(
+        self,
+        video_info_list: List[Dict],
+        delay: float = 1.0,
+        max_workers: Optional[int] = None,
+        min_interval: float = 0.1,
+    ) -> Iterator[Dict]:
         """
-        批量获取视频字幕
+        逐个产出批量获取的视频字幕结果，调用方可以边获取边处理
 
         Args:
             video_info_list: 视频信息列表
-            delay: 请求间隔时间（秒），默认为1秒
-            reformat: 是否对字幕进行重新排版，默认为False
+            delay: 串行模式下的请求间隔时间（秒），默认为1秒
+            max_workers: 最大并发线程数，指定时使用线程池并发获取，默认为None（串行）
+            min_interval: 并发模式下相邻两次请求发起的最小间隔（秒），默认为0.1秒
 
-        Returns:
-            字幕信息列表
+        Yields:
+            字幕信息字典，顺序与 video_info_list 一致
         """
-        results = []
         total = len(video_info_list)
-        
+        # 本批次的字幕结果共用一个 fetch_time，JSON Lines 边写边输出时各行也保持一致
+        batch_fetch_time = datetime.now().isoformat()
+        self._reset_counts()
+
+        if max_workers is not None:
+            print(f"开始并发获取 {total} 个视频的字幕 (max_workers={max_workers})...")
+
+            def fetch(video_info: Dict) -> Dict:
+                return self.get_video_subtitles(video_info, reformat=self.reformat, fetch_time=batch_fetch_time)
+
+            # 进度条按结果产出的顺序前进，最慢的视频会暂时挡住后面已完成的视频
+            results = self._iter_concurrent(fetch, video_info_list, max_workers, min_interval)
+            yield from tqdm(results, total=total, desc="获取字幕(并发)", unit="视频")
+            return
+
         print(f"开始批量获取 {total} 个视频的字幕...")
-        
-        for i, video_info in enumerate(video_info_list, 1):
-            print(f"[{i}/{total}] ", end="")
-            
+
+        # 用进度条代替逐个视频打印进度
+        for i, video_info in enumerate(tqdm(video_info_list, desc="获取字幕", unit="视频"), 1):
             # 获取单个视频字幕
-            subtitle_result = self.get_video_subtitles(video_info, reformat=self.reformat)
-            results.append(subtitle_result)
+            yield self._tally_result(
+                self.get_video_subtitles(video_info, reformat=self.reformat, fetch_time=batch_fetch_time)
+            )
             
             # 添加随机延迟避免请求过快
             if i < total:  # 最后一个不需要延迟
                 sleep_time = delay + random.uniform(0, 0.5)
                 time.sleep(sleep_time)
+
+    def get_batch_subtitles(self, video_info_list: List[Dict], delay: float = 1.0, reformat: bool = False) -> List[Dict]:
+        """
+        批量获取视频字幕
+
+        Args:
+            video_info_list: 视频信息列表
+            delay: 请求间隔时间（秒），默认为1秒
+            reformat: 是否对字幕进行重新排版，默认为False
+
+        Returns:
+            字幕信息列表
+        """
+        results = list(self.iter_batch_subtitles(video_info_list, delay=delay))
         
-        print(f"\n批量获取完成，成功: {sum(1 for r in results if r.get('success', False))}，"
-              f"失败: {sum(1 for r in results if not r.get('success', True))}")
+        print(f"\n批量获取完成，成功: {self.last_success_count}，失败: {self.last_fail_count}")
         
         return results
 
-    def save_results_to_json(self, results: List[Dict], filename: str = None) -> str:
+    def get_batch_subtitles_concurrent(
+        self,
+        video_info_list: List[Dict],
+        max_workers: int = 2,
+        min_interval: float = 0.1,
+    ) -> List[Dict]:
         """
-        将结果保存为JSON文件
+        使用线程池并发批量获取视频字幕
 
         Args:
-            results: 字幕信息列表
-            filename: 文件名，如果为None则自动生成
+            video_info_list: 视频信息列表
+            max_workers: 最大并发线程数，默认为2
+            min_interval: 相邻两次请求发起的最小间隔（秒），默认为0.1秒
 
         Returns:
-            保存的文件路径
+            字幕信息列表，顺序与 video_info_list 一致
+        """
+        results = list(self.iter_batch_subtitles(
+            video_info_list, max_workers=max_workers, min_interval=min_interval
+        ))
+
+        print(f"\n批量获取完成，成功: {self.last_success_count}，失败: {self.last_fail_count}")
+
+        return results
+
+    def _output_file_path(self, filename: Optional[str], suffix: str) -> str:
         """
-        # 确保output文件夹存在
-        output_dir = "output"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        生成 output 目录下的结果文件路径
+
+        Args:
+            filename: 文件名，如果为None则按时间戳自动生成
+            suffix: 文件扩展名（如 .json、.jsonl）
+
+        Returns:
+            结果文件路径
+        """
+        # 确保output文件夹存在（exist_ok 一次调用完成，并发写入时也不会因目录已存在而报错）
+        _OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
         
         # 生成文件名
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"subtitle_{timestamp}.json"
+            filename = f"subtitle_{timestamp}{suffix}"
         
-        if not filename.endswith('.json'):
-            filename += '.json'
+        if not filename.endswith(suffix):
+            filename += suffix
         
-        file_path = os.path.join(output_dir, filename)
+        return str(_OUTPUT_DIR / filename)
+
+    def save_results_to_json(self, results: List[Dict], filename: str = None) -> str:
+        """
+        将结果保存为JSON文件
+
+        Args:
+            results: 字幕信息列表
+            filename: 文件名，如果为None则自动生成
+
+        Returns:
+            保存的文件路径
+        """
+        file_path = self._output_file_path(filename, '.json')
         
-        # 保存结果
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        # 保存结果（直接输出 UTF-8 字节，中文字幕无需转义）
+        dump_json_file(results, file_path)
         
         print(f"结果已保存到: {file_path}")
         return file_path
 
+    def save_batch_subtitles_to_jsonl(
+        self,
+        video_info_list: List[Dict],
+        filename: str = None,
+        delay: float = 1.0,
+        max_workers: Optional[int] = None,
+    ) -> Tuple[str, int, int]:
+        """
+        批量获取字幕并以 JSON Lines 格式逐条写入文件
+
+        每个视频的结果获取后立即写出，不在内存中保留全部结果，
+        适合字幕数量很多的批量任务；需要JSON数组格式时可用 jsonl_to_json 转换。
+
+        Args:
+            video_info_list: 视频信息列表
+            filename: 文件名，如果为None则自动生成
+            delay: 串行模式下的请求间隔时间（秒），默认为1秒
+            max_workers: 最大并发线程数，指定时并发获取，默认为None（串行）
+
+        Returns:
+            (保存的文件路径, 成功数量, 总数量)
+        """
+        file_path = self._output_file_path(filename, '.jsonl')
+
+        with open(file_path, 'wb') as f:
+            for result in self.iter_batch_subtitles(video_info_list, delay=delay, max_workers=max_workers):
+                f.write(dumps_json_line(result))
+
+        success_count = self.last_success_count
+        total = success_count + self.last_fail_count
+        print(f"\n批量获取完成，成功: {success_count}，失败: {self.last_fail_count}")
+        print(f"结果已保存到: {file_path}")
+        return file_path, success_count, total
+
     def load_video_info_from_json(self, json_path: str) -> List[Dict]:
         """
         从JSON文件加载视频信息
@@ -401,8 +682,8 @@ class SubtitleExtractor:
             视频信息列表
         """
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，下方异常处理同样适用
+            data = load_json_file(json_path)
             
             # 如果数据是列表，直接返回；如果是字典，包装成列表
             if isinstance(data, list):
@@ -427,15 +708,16 @@ class SubtitleExtractor:
 def main():
     """主函数"""
     
-    # 创建字幕提取器
-    extractor = SubtitleExtractor()
-    
     # 解析命令行参数
     if len(sys.argv) < 2:
         print("使用方法:")
         print("  python get_subtitle.py <json_file>")
         print("  python get_subtitle.py <json_file> --output <output_filename>")
         print("  python get_subtitle.py <json_file> --cookie <cookie_path>")
+        print("  python get_subtitle.py <json_file> --workers <线程数>")
+        print("  python get_subtitle.py <json_file> --cache")
+        print("  python get_subtitle.py <json_file> --jsonl")
+        print("  python get_subtitle.py <json_file> --jsonl --json")
         print("\n示例:")
         print("  python get_subtitle.py example/bv_info_example.json")
         print("  python get_subtitle.py example/bv_info_example.json --output subtitle_result.json")
@@ -444,6 +726,10 @@ def main():
     json_path = sys.argv[1]
     output_filename = None
     cookie_path = None
+    workers = 1
+    use_cache = False
+    use_jsonl = False
+    convert_to_json = False
     reformat = False
     api_key = None # 重新排版需要提供api_key
     
@@ -462,15 +748,43 @@ def main():
         elif arg == '--cookie':
             if i + 1 < len(sys.argv):
                 cookie_path = sys.argv[i + 1]
-                extractor = SubtitleExtractor(cookie_path=cookie_path, reformat=reformat, api_key=api_key)
                 i += 2
             else:
                 print("--cookie 参数需要指定cookie路径")
                 sys.exit(1)
+        elif arg == '--jsonl':
+            use_jsonl = True
+            i += 1
+        elif arg == '--json':
+            # 边获取边写入 JSON Lines，全部完成后再转换为与普通模式相同格式的JSON文件
+            use_jsonl = True
+            convert_to_json = True
+            i += 1
+        elif arg == '--cache':
+            use_cache = True
+            i += 1
+        elif arg == '--no-cache':
+            use_cache = False
+            i += 1
+        elif arg == '--workers':
+            if i + 1 < len(sys.argv) and sys.argv[i + 1].isdigit() and int(sys.argv[i + 1]) > 0:
+                workers = int(sys.argv[i + 1])
+                i += 2
+            else:
+                print("--workers 参数需要指定正整数线程数")
+                sys.exit(1)
         else:
             print(f"未知参数: {arg}")
             i += 1
     
+    # 参数解析完成后再创建字幕提取器，cookie文件只需读取一次
+    extractor = SubtitleExtractor(
+        cookie_path=cookie_path,
+        reformat=reformat,
+        api_key=api_key,
+        cache_dir=DEFAULT_SUBTITLE_CACHE_DIR if use_cache else None,
+    )
+    
     # 加载视频信息
     print(f"正在加载视频信息: {json_path}")
     video_info_list = extractor.load_video_info_from_json(json_path)
@@ -482,19 +796,30 @@ def main():
     print(f"找到 {len(video_info_list)} 个视频")
     print("-" * 50)
     
-    # 获取字幕
-    results = extractor.get_batch_subtitles(video_info_list, delay=1.0, reformat=True)
-    
-    # 保存结果
-    output_path = extractor.save_results_to_json(results, output_filename)
+    # 获取字幕并保存结果
+    if use_jsonl:
+        # 边获取边写入 JSON Lines 文件，不在内存中保留全部结果
+        output_path, success_count, total = extractor.save_batch_subtitles_to_jsonl(
+            video_info_list, output_filename, delay=1.0, max_workers=workers if workers > 1 else None
+        )
+        if convert_to_json:
+            output_path = jsonl_to_json(output_path)
+    else:
+        if workers > 1:
+            results = extractor.get_batch_subtitles_concurrent(video_info_list, max_workers=workers)
+        else:
+            results = extractor.get_batch_subtitles(video_info_list, delay=1.0, reformat=True)
+        
+        output_path = extractor.save_results_to_json(results, output_filename)
+        success_count = extractor.last_success_count
+        total = len(results)
     
     # 输出统计信息
-    success_count = sum(1 for r in results if r.get('success', False))
-    fail_count = len(results) - success_count
+    fail_count = total - success_count
     
     print("-" * 50)
     print(f"处理完成!")
-    print(f"总计: {len(results)} 个视频")
+    print(f"总计: {total} 个视频")
     print(f"成功: {success_count} 个")
     print(f"失败: {fail_count} 个")
     print(f"结果已保存到: {output_path}")
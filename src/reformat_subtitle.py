@@ -9,14 +9,106 @@
 
 import os
 import json
+import functools
+import hashlib
 import yaml
 import requests
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
 import configparser
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Optional
 from pathlib import Path
 
+# 优先使用 libyaml 提供的 C 加载器，不可用时退回纯 Python 实现
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+from common import loads_json, dumps_json, dumps_json_line, load_json_file, dump_json_file, atomic_write_bytes, RequestThrottle
+
+# 调用大模型时使用的采样温度，同时参与响应缓存的键
+_TEMPERATURE = 0.7
+
+# 大模型响应的默认磁盘缓存目录
+DEFAULT_LLM_CACHE_DIR = os.path.join("output", ".llm_cache")
+
+# 批量排版断点续跑文件的默认目录
+DEFAULT_CHECKPOINT_DIR = os.path.join("output", ".reformat_checkpoint")
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_prompt_file(yaml_path_str: str, mtime_ns: int, size: int) -> tuple:
+    """
+    解析提示词文件，同一进程内按 (路径, 修改时间, 文件大小) 缓存结果
+
+    Args:
+        yaml_path_str: YAML 文件路径
+        mtime_ns: YAML 文件的修改时间（纳秒），文件变化后自动失效
+        size: YAML 文件大小（字节）
+
+    Returns:
+        (system_prompt, user_prompt) 元组，不可变，可安全地在线程之间共享
+    """
+    with open(yaml_path_str, 'r', encoding='utf-8') as f:
+        prompts = yaml.load(f, Loader=_YamlLoader)
+    return prompts.get('system_prompt', ''), prompts.get('user_prompt', '')
+
+
+def _load_checkpoint(checkpoint_path: str, signature: Dict) -> Optional[Dict[str, Dict]]:
+    """
+    读取断点续跑文件中已完成的排版结果
+
+    文件首行记录生成这些结果时的输入文件、模型与提示词摘要，与当前不一致时整个文件作废，
+    避免输入文件重新生成、修改 prompt.yml 或更换模型后继续沿用旧的排版结果。
+
+    Args:
+        checkpoint_path: JSON Lines 格式的断点文件路径
+        signature: 当前的输入文件、模型与提示词摘要
+
+    Returns:
+        条目键到排版结果的字典；文件不存在或与当前配置不一致时返回None
+    """
+    done = {}
+    try:
+        with open(checkpoint_path, 'rb') as f:
+            try:
+                header = loads_json(f.readline())
+            except ValueError:
+                return None
+            if not isinstance(header, dict) or header.get('signature') != signature:
+                return None
+            for line in f:
+                try:
+                    record = loads_json(line)
+                    done[record['key']] = record['result']
+                except (ValueError, KeyError, TypeError):
+                    # 进程中断时最后一行可能只写了一半，忽略即可
+                    continue
+    except FileNotFoundError:
+        return None
+    return done
+
+
+def _is_fully_reformatted(subtitle_data: Dict) -> bool:
+    """
+    判断一个视频的所有非空字幕是否都已排版成功
+
+    Args:
+        subtitle_data: reformat_subtitle_content 返回的字幕数据
+
+    Returns:
+        全部排版成功时返回True
+    """
+    return all(
+        'reformatted_content' in subtitle
+        for subtitle in subtitle_data.get('subtitles', [])
+        if subtitle.get('content')
+    )
+
 
 class SubtitleReformatter:
     """字幕重新排版器"""
@@ -27,6 +119,9 @@ class SubtitleReformatter:
         model: str,
         base_url: str,
         llm_timeout_sec: int = 40,
+        cache_dir: Optional[str] = None,
+        requests_per_second: Optional[float] = 5.0,
+        stream: bool = True,
     ):
         """
         初始化字幕重新排版器
@@ -35,6 +130,12 @@ class SubtitleReformatter:
             api_key: 大模型 API 密钥，必须提供
             model: 大模型名称，必须提供
             base_url: 大模型 API 基础地址，必须提供
+            cache_dir: 大模型响应的磁盘缓存目录，默认为None不使用缓存。
+                采样温度不为0时同一提示词的输出并不唯一，因此缓存需显式开启
+            requests_per_second: 每秒最多发起的大模型请求数，默认为5；为None时不限速。
+                所有线程共享该限额，命中响应缓存的调用不计入
+            stream: 是否以流式（SSE）方式接收大模型输出，默认为True。
+                流式接收时超时按相邻两段数据的间隔计算，长文本生成不会因总耗时超时
         """
         if not api_key:
             raise ValueError("必须提供大模型 API Key")
@@ -42,11 +143,67 @@ class SubtitleReformatter:
             raise ValueError("必须提供大模型名称")
         if not base_url:
             raise ValueError("必须提供大模型 API 基础地址")
+        if requests_per_second is not None and requests_per_second <= 0:
+            raise ValueError("每秒请求数必须为正数")
 
         self.api_key = api_key
         self.model = model
         self.base_url = base_url.rstrip('/')
         self.llm_timeout_sec = llm_timeout_sec
+        self.stream = stream
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        # 相邻两次请求发起的最小间隔（秒）
+        self._min_request_interval = 1.0 / requests_per_second if requests_per_second else 0.0
+
+        # 复用同一个会话的连接池，避免每次调用大模型都重新建立 TCP/TLS 连接；
+        # 鉴权等固定请求头只设置一次；对限流与服务端错误按指数退避自动重试
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        })
+        retry = Retry(
+            total=5,
+            # 请求已发出后的读取错误不重试：服务端可能已完成并计费了这次生成，
+            # 重发会重复付费；只对连接失败与限流/服务端错误状态码重试
+            read=0,
+            other=0,
+            # 指数退避叠加随机抖动，避免多个线程被同一次限流后同时重试
+            backoff_factor=0.8,
+            backoff_jitter=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(['POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # 进行中的大模型调用（调用键 -> Future），用于合并同时发起的相同请求；调用结束即移除。
+        # 该锁同时保护批量排版时各轮自己的调用表
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+        # 响应缓存的命中/未命中次数，多线程排版时由锁保护
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_stats_lock = threading.Lock()
+
+        # 并发排版时用于错开各线程的请求发起时间
+        self._throttle = RequestThrottle()
+
+    def close(self) -> None:
+        """关闭复用的 HTTP 会话"""
+        self.session.close()
+
+    def __enter__(self):
+        """支持 with 语句，退出时自动关闭会话"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """退出 with 语句时关闭会话"""
+        self.close()
 
     def _load_prompts_from_yaml(self, yaml_path: Optional[str] = None) -> dict:
         """
@@ -65,12 +222,12 @@ class SubtitleReformatter:
             yaml_path = project_root / "config" / "prompt.yml"
 
         try:
-            with open(yaml_path, 'r', encoding='utf-8') as f:
-                prompts = yaml.safe_load(f)
-            
+            # 运行期间修改提示词文件后，修改时间或大小变化即重新解析
+            st = os.stat(yaml_path)
+            system_prompt, user_prompt = _parse_prompt_file(str(yaml_path), st.st_mtime_ns, st.st_size)
             return {
-                'system_prompt': prompts.get('system_prompt', ''),
-                'user_prompt': prompts.get('user_prompt', '')
+                'system_prompt': system_prompt,
+                'user_prompt': user_prompt
             }
         except FileNotFoundError:
             raise FileNotFoundError(f"提示词文件不存在: {yaml_path}")
@@ -79,23 +236,181 @@ class SubtitleReformatter:
         except Exception as e:
             raise RuntimeError(f"加载提示词失败: {e}")
 
-    def _call_llm_api(self, system_prompt: str, user_prompt: str) -> str:
+    def _prompt_key(self, system_prompt: str, user_prompt: str) -> str:
+        """
+        计算一次大模型调用的唯一键（模型、采样温度与提示词的 SHA-256）
+
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户提示词
+
+        Returns:
+            十六进制摘要字符串
+        """
+        key_source = json.dumps({
+            "model": self.model,
+            "temperature": _TEMPERATURE,
+            "system": system_prompt,
+            "user": user_prompt,
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+    def _llm_cache_path(self, key: str) -> Optional[Path]:
+        """
+        计算调用键对应的响应缓存文件路径
+
+        Args:
+            key: _prompt_key 计算出的调用键
+
+        Returns:
+            缓存文件路径，未启用缓存时返回None
+        """
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{key}.json"
+
+    def _write_llm_cache(self, cache_path: Path, content: str) -> None:
+        """
+        原子写入大模型响应缓存文件
+
+        Args:
+            cache_path: 缓存文件路径
+            content: 大模型返回的排版内容
+        """
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # 原子写入，避免并发读取到写了一半的缓存
+            atomic_write_bytes(cache_path, dumps_json({"content": content}))
+        except OSError:
+            # 缓存只是加速手段，写入失败不影响排版
+            pass
+
+    def _count_cache(self, hit: bool) -> None:
+        """
+        累计响应缓存的命中/未命中次数
+
+        Args:
+            hit: 是否命中缓存
+        """
+        with self._cache_stats_lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    @staticmethod
+    def _read_stream_content(response: requests.Response) -> str:
+        """
+        读取流式（SSE）响应，拼接各数据帧中增量输出的内容
+
+        Args:
+            response: 以 stream=True 发起请求得到的响应
+
+        Returns:
+            完整的输出内容
+        """
+        parts = []
+        received_choices = False
+        for line in response.iter_lines():
+            # 只处理 data 帧，忽略空行与注释（心跳）行
+            if not line.startswith(b'data:'):
+                continue
+            data = line[5:].strip()
+            if data == b'[DONE]':
+                break
+            chunk = loads_json(data)
+            if 'error' in chunk:
+                raise ValueError(f"API 返回错误: {chunk['error']}")
+            choices = chunk.get('choices')
+            if not choices:
+                continue
+            received_choices = True
+            content = (choices[0].get('delta') or {}).get('content')
+            if content:
+                parts.append(content)
+
+        if not received_choices:
+            raise ValueError("API 返回格式异常: 流式响应中没有 choices")
+        return ''.join(parts)
+
+    def _call_llm_api(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        run_calls: Optional[Dict[str, Future]] = None,
+    ) -> str:
         """
         调用 OpenAI 兼容的大模型 API 进行文本重新排版
 
+        同时发起的相同提示词只调用一次：已在进行中的调用由后来者等待并共享结果。
+        未传入 run_calls 时，调用结束（无论成功或失败）后即从进行中的表里移除，之后的相同请求会重新调用；
+        传入 run_calls 时，成功的结果在该表中保留到本轮批量排版结束，
+        同一轮内先后出现的相同字幕（如 zh 与 zh-CN 内容相同）只调用一次。
+        需要跨批次复用结果时请显式开启磁盘响应缓存（cache_dir）。
+
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户提示词
+            run_calls: 本轮批量排版共用的调用表（调用键 -> Future），由调用方创建并在结束后丢弃
+
+        Returns:
+            重新排版后的文本内容
+        """
+        key = self._prompt_key(system_prompt, user_prompt)
+        calls = self._inflight if run_calls is None else run_calls
+        with self._inflight_lock:
+            future = calls.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                calls[key] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            content = self._request_llm_content(system_prompt, user_prompt, key)
+        except BaseException as e:
+            # 失败的调用不保留，之后的相同请求会重新调用
+            with self._inflight_lock:
+                calls.pop(key, None)
+            future.set_exception(e)
+            raise
+        if run_calls is None:
+            with self._inflight_lock:
+                calls.pop(key, None)
+        future.set_result(content)
+        return content
+
+    def _request_llm_content(self, system_prompt: str, user_prompt: str, key: str) -> str:
+        """
+        读取磁盘缓存或请求大模型 API，获取一次调用的输出内容
+
         Args:
             system_prompt: 系统提示词
             user_prompt: 用户提示词
+            key: _prompt_key 计算出的调用键
 
         Returns:
             重新排版后的文本内容
         """
+        # 相同的模型与提示词命中磁盘缓存时直接返回，省去一次大模型调用
+        cache_path = self._llm_cache_path(key)
+        if cache_path is not None:
+            try:
+                content = loads_json(cache_path.read_bytes())['content']
+                self._count_cache(True)
+                return content
+            except (OSError, ValueError, KeyError, TypeError):
+                # 缓存不存在或已损坏，重新调用大模型
+                self._count_cache(False)
+
         url = f"{self.base_url}/chat/completions"
-        
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
+
+        # 按每秒请求数限速，多个线程并发调用时依次错开请求发起时间；
+        # 不叠加随机抖动，实际速率即为 requests_per_second
+        if self._min_request_interval:
+            self._throttle.wait(self._min_request_interval, jitter=0)
         
         payload = {
             "model": self.model,
@@ -112,40 +427,53 @@ class SubtitleReformatter:
             "thinking": {
                 "type": "disabled"
             },
-            "temperature": 0.7,
-            "stream": False,
+            "temperature": _TEMPERATURE,
+            "stream": self.stream,
 
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=self.llm_timeout_sec)
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # 提取返回的内容
-            if 'choices' in result and len(result['choices']) > 0:
-                content = result['choices'][0]['message']['content']
-                return content
-            else:
-                raise ValueError(f"API 返回格式异常: {result}")
+            with self.session.post(url, json=payload, timeout=self.llm_timeout_sec, stream=self.stream) as response:
+                response.raise_for_status()
+
+                if self.stream:
+                    # 边生成边接收，逐帧拼接输出内容
+                    content = self._read_stream_content(response)
+                else:
+                    # 直接解析原始字节，省去先解码为字符串
+                    result = loads_json(response.content)
+
+                    # 提取返回的内容
+                    if 'choices' in result and len(result['choices']) > 0:
+                        content = result['choices'][0]['message']['content']
+                    else:
+                        raise ValueError(f"API 返回格式异常: {result}")
+
+            if cache_path is not None:
+                self._write_llm_cache(cache_path, content)
+            return content
                 
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"调用大模型 API 失败: {e}")
         except json.JSONDecodeError as e:
             raise RuntimeError(f"解析 API 响应失败: {e}")
 
-    def reformat_subtitle_content(self, subtitle_data: Dict) -> Dict:
+    def reformat_subtitle_content(
+        self,
+        subtitle_data: Dict,
+        run_calls: Optional[Dict[str, Future]] = None,
+    ) -> Dict:
         """
         使用大模型对字幕文件的 content 字段进行重新排版
 
         Args:
             subtitle_data: 字幕数据字典，格式与 JSON 文件中的单个元素相同
+            run_calls: 本轮批量排版共用的调用表，传入时同一轮内相同的字幕只调用一次大模型
 
         Returns:
             重新排版后的字幕数据字典，保持原有结构，只更新 content 字段
         """
-        # 加载提示词
+        # 加载提示词（文件未变化时直接复用已解析的结果）
         prompts = self._load_prompts_from_yaml()
         system_prompt_template = prompts['system_prompt']
         user_prompt_template = prompts['user_prompt']
@@ -153,8 +481,13 @@ class SubtitleReformatter:
         # 获取视频标题作为主题
         topic = subtitle_data.get('title', '未知主题')
         
-        # 填充系统提示词模板中的占位符
+        # 填充系统提示词模板中的占位符（默认模板的系统提示词不含占位符，
+        # 对所有视频保持不变，便于服务端复用提示词前缀缓存）
         system_prompt = system_prompt_template.replace('{{Topic}}', topic)
+
+        # 主题在同一视频的所有字幕间相同，循环外先填充并按 {{contents}} 切分，
+        # 循环内只需拼接字幕内容
+        user_prompt_parts = user_prompt_template.replace('{{Topic}}', topic).split('{{contents}}')
         
         # 处理所有字幕的 content 字段
         reformatted_subtitles = []
@@ -167,45 +500,171 @@ class SubtitleReformatter:
                 continue
             
             # 填充用户提示词模板
-            user_prompt = user_prompt_template.replace('{{Topic}}', topic)
-            user_prompt = user_prompt.replace('{{contents}}', original_content)
+            user_prompt = original_content.join(user_prompt_parts)
             
             try:
                 # 调用大模型 API
-                reformatted_content = self._call_llm_api(system_prompt, user_prompt)
+                reformatted_content = self._call_llm_api(system_prompt, user_prompt, run_calls)
                 
                 # 创建新的字幕字典，保持原有字段，只更新 content
-                new_subtitle = subtitle.copy()
-                new_subtitle['reformatted_content'] = reformatted_content
-                reformatted_subtitles.append(new_subtitle)
+                reformatted_subtitles.append(dict(subtitle, reformatted_content=reformatted_content))
                 
             except Exception as e:
                 print(f"  ✗ {subtitle.get('lan', 'unknown')} 字幕重新排版失败: {e}")
                 # 如果失败，保持原样
                 reformatted_subtitles.append(subtitle)
         
-        # 创建新的结果字典，保持原有结构
-        result = subtitle_data.copy()
-        result['subtitles'] = reformatted_subtitles
-        result['reformat_time'] = datetime.now().isoformat()
-        
-        return result
+        # 创建新的结果字典，保持原有结构（一次构造，不修改调用方传入的数据）
+        return dict(
+            subtitle_data,
+            subtitles=reformatted_subtitles,
+            reformat_time=datetime.now().isoformat(),
+        )
+
+    def reformat_many(self, items: List[Dict], max_workers: int = 4) -> List[str]:
+        """
+        并发对多条字幕进行重新排版
+
+        每条字幕仍单独调用一次大模型（提示词按字幕填充），
+        但多条字幕的请求同时发出，总耗时接近最慢的一次调用；
+        本次调用内主题与内容都相同的字幕只请求一次。
+
+        Args:
+            items: 待排版的字幕列表，每项包含 title、lan、content 字段（可选 bv 字段用于日志）
+            max_workers: 最大并发请求数，默认为4
+
+        Returns:
+            与 items 一一对应的排版后内容，排版失败或内容为空时为空字符串
+        """
+        # 本次调用内共用的调用表，返回后即丢弃
+        run_calls: Dict[str, Future] = {}
+
+        def reformat_one(item: Dict) -> str:
+            try:
+                # 构造临时数据结构用于重新排版
+                reformatted_data = self.reformat_subtitle_content({
+                    "title": item.get('title', '未知主题'),
+                    "subtitles": [{
+                        "lan": item.get('lan', ''),
+                        "content": item.get('content', '')
+                    }]
+                }, run_calls)
+                # 提取重新排版后的内容
+                subtitles = reformatted_data.get('subtitles')
+                return subtitles[0].get('reformatted_content', '') if subtitles else ''
+            except Exception as e:
+                print(f"  警告：{item.get('bv', 'unknown')} {item.get('lan', 'unknown')} 字幕重新排版失败: {e}")
+                return ''
+
+        if len(items) <= 1:
+            return [reformat_one(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(reformat_one, items))
+
+    def _checkpoint_path(self, json_path: str) -> str:
+        """
+        计算输入文件对应的断点文件路径
+
+        断点文件放在输出目录下，按输入文件的绝对路径区分，输入所在目录只读时也能续跑。
+
+        Args:
+            json_path: 输入的 JSON 字幕文件路径
+
+        Returns:
+            断点文件路径
+        """
+        path_hash = hashlib.sha1(os.path.abspath(json_path).encode('utf-8')).hexdigest()[:12]
+        return os.path.join(DEFAULT_CHECKPOINT_DIR, f"{Path(json_path).stem}_{path_hash}.jsonl")
+
+    def _checkpoint_signature(self, json_path: str) -> Dict:
+        """
+        计算断点结果对应的输入文件、模型与提示词摘要（模型与提示词部分与响应缓存键使用相同的输入）
+
+        Args:
+            json_path: 输入的 JSON 字幕文件路径
+
+        Returns:
+            包含输入文件修改时间与大小、模型、采样温度与提示词模板 SHA-256 的字典
+        """
+        prompts = self._load_prompts_from_yaml()
+        prompt_source = json.dumps(prompts, sort_keys=True, ensure_ascii=False)
+        # 输入文件在中断后被重新生成时，"序号:BV号" 对应的内容可能已经变化，旧的断点随之作废
+        input_stat = os.stat(json_path)
+        return {
+            "input": {"mtime_ns": input_stat.st_mtime_ns, "size": input_stat.st_size},
+            "model": self.model,
+            "temperature": _TEMPERATURE,
+            "prompt": hashlib.sha256(prompt_source.encode('utf-8')).hexdigest(),
+        }
+
+    def _open_checkpoint(self, checkpoint_path: str, json_path: str, resume: bool):
+        """
+        打开断点文件并读取其中已完成的结果
+
+        Args:
+            checkpoint_path: 断点文件路径
+            json_path: 输入的 JSON 字幕文件路径
+            resume: 是否沿用已有的断点结果；为False时重新开始
 
-    def reformat_subtitle_json_file(self, json_path: str, output_path: Optional[str] = None) -> str:
+        Returns:
+            (以追加方式打开的断点文件, 已完成结果的字典)；
+            断点文件无法使用（如目录不可写、提示词加载失败）时文件为None，不启用断点
+        """
+        try:
+            signature = self._checkpoint_signature(json_path)
+            done = _load_checkpoint(checkpoint_path, signature) if resume else None
+            os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+            if done is None:
+                # 不存在、与当前输入文件/模型/提示词不一致或不续跑时，重写文件并记录摘要
+                checkpoint = open(checkpoint_path, 'wb')
+                checkpoint.write(dumps_json_line({"signature": signature}))
+                checkpoint.flush()
+                return checkpoint, {}
+
+            checkpoint = open(checkpoint_path, 'ab')
+            # 上次中断时若最后一行未写完整，先换行，避免与新记录拼在同一行
+            if checkpoint.tell() > 0:
+                with open(checkpoint_path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        checkpoint.write(b'\n')
+            return checkpoint, done
+        except Exception as e:
+            print(f"警告：断点文件不可用，本次不记录进度: {e}")
+            return None, {}
+
+    def reformat_subtitle_json_file(
+        self,
+        json_path: str,
+        output_path: Optional[str] = None,
+        max_workers: int = 4,
+        pretty: bool = False,
+        resume: bool = True,
+    ) -> str:
         """
         对 JSON 字幕文件中的所有字幕进行重新排版
 
+        多个视频的字幕使用线程池并发排版，请求频率由初始化时的
+        requests_per_second 限制，代替原先每个视频之间固定等待1秒。
+
+        每个视频排版成功后立即追加到输出目录下的断点文件（output/.reformat_checkpoint/），
+        进程中断后再次运行时跳过已完成的视频；输入文件、模型或提示词变化后旧的断点作废，
+        结果保存成功后删除断点文件。
+
         Args:
             json_path: 输入的 JSON 字幕文件路径
             output_path: 输出的 JSON 文件路径，如果为None则自动生成
+            max_workers: 最大并发线程数，默认为4；为1时逐个排版
+            pretty: 是否以缩进格式保存结果，默认为False（紧凑格式）
+            resume: 是否从断点文件恢复已完成的结果，默认为True；为False时重新排版全部视频
 
         Returns:
             输出文件路径
         """
         # 加载 JSON 文件
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                subtitle_list = json.load(f)
+            subtitle_list = load_json_file(json_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"文件不存在: {json_path}")
         except json.JSONDecodeError as e:
@@ -214,28 +673,56 @@ class SubtitleReformatter:
         if not isinstance(subtitle_list, list):
             raise ValueError("JSON 文件格式不正确，应为列表格式")
         
-        # 处理每个字幕数据
-        reformatted_results = []
         total = len(subtitle_list)
-        
-        print(f"开始重新排版 {total} 个字幕文件...")
-        
-        for i, subtitle_data in enumerate(subtitle_list, 1):
-            print(f"[{i}/{total}] 处理 {subtitle_data.get('bv', 'unknown')}: {subtitle_data.get('title', 'unknown')}")
-            
-            try:
-                reformatted_data = self.reformat_subtitle_content(subtitle_data)
-                reformatted_results.append(reformatted_data)
-                print(f"✓ {subtitle_data.get('bv', 'unknown')} 处理完成")
-            except Exception as e:
-                print(f"✗ {subtitle_data.get('bv', 'unknown')} 处理失败: {e}")
-                # 如果失败，保持原样
-                reformatted_results.append(subtitle_data)
-            
-            # 添加延迟避免请求过快
-            if i < total:
-                time.sleep(1)
-        
+
+        # 断点文件：已完成的视频以 "序号:BV号" 为键逐行记录，无法使用时不影响排版
+        checkpoint_path = self._checkpoint_path(json_path)
+        checkpoint, done = self._open_checkpoint(checkpoint_path, json_path, resume)
+        if done:
+            print(f"从断点文件恢复 {len(done)} 个已完成的字幕文件: {checkpoint_path}")
+
+        print(f"开始重新排版 {total} 个字幕文件 (max_workers={max_workers})...")
+
+        checkpoint_lock = threading.Lock()
+        # 本轮排版共用的调用表，同一文件内相同的字幕只调用一次大模型，结束后即丢弃
+        run_calls: Dict[str, Future] = {}
+        try:
+            def reformat_one(indexed: tuple) -> Dict:
+                i, subtitle_data = indexed
+                key = f"{i}:{subtitle_data.get('bv', '')}"
+                if key in done:
+                    return done[key]
+
+                print(f"[{i}/{total}] 处理 {subtitle_data.get('bv', 'unknown')}: {subtitle_data.get('title', 'unknown')}")
+
+                try:
+                    reformatted_data = self.reformat_subtitle_content(subtitle_data, run_calls)
+                    print(f"✓ {subtitle_data.get('bv', 'unknown')} 处理完成")
+                except Exception as e:
+                    print(f"✗ {subtitle_data.get('bv', 'unknown')} 处理失败: {e}")
+                    # 如果失败，保持原样
+                    return subtitle_data
+
+                # 只记录全部字幕都排版成功的视频，部分失败的视频下次运行时重试
+                if checkpoint is not None and _is_fully_reformatted(reformatted_data):
+                    line = dumps_json_line({"key": key, "result": reformatted_data})
+                    with checkpoint_lock:
+                        try:
+                            checkpoint.write(line)
+                            checkpoint.flush()
+                            os.fsync(checkpoint.fileno())
+                        except OSError:
+                            # 断点只是续跑手段，写入失败（如磁盘已满）不影响本次排版
+                            pass
+                return reformatted_data
+
+            # 并发排版各视频，结果按视频在输入文件中的顺序收集，保存时保持原有顺序
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+                reformatted_results = list(executor.map(reformat_one, enumerate(subtitle_list, 1)))
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
         # 生成输出文件路径
         if output_path is None:
             # 确保output文件夹存在
@@ -251,10 +738,18 @@ class SubtitleReformatter:
         if not output_path.endswith('.json'):
             output_path += '.json'
         
-        # 保存结果
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(reformatted_results, f, ensure_ascii=False, indent=2)
+        # 保存结果（原子写入，进程中断时不会留下写了一半的结果；默认紧凑格式，体积约为缩进格式的一半）
+        dump_json_file(reformatted_results, output_path, indent=pretty, atomic=True)
+
+        # 结果已完整保存，断点文件不再需要
+        if checkpoint is not None:
+            try:
+                os.unlink(checkpoint_path)
+            except OSError:
+                pass
         
+        if self.cache_dir is not None:
+            print(f"响应缓存命中: {self.cache_hits}，未命中: {self.cache_misses}")
         print(f"\n结果已保存到: {output_path}")
         return output_path
 
@@ -267,6 +762,11 @@ def main():
         print("使用方法:")
         print("  python reformat_subtitle.py <json_file>")
         print("  python reformat_subtitle.py <json_file> --output <output_filename>")
+        print("  python reformat_subtitle.py <json_file> --workers <N>")
+        print("  python reformat_subtitle.py <json_file> --cache")
+        print("  python reformat_subtitle.py <json_file> --pretty")
+        print("  python reformat_subtitle.py <json_file> --no-resume")
+        print("  python reformat_subtitle.py <json_file> --rps <每秒请求数>")
         print("\n示例:")
         print("  python reformat_subtitle.py output/subtitle_20260117_163516.json")
         print("  python reformat_subtitle.py output/subtitle_20260117_163516.json --output reformatted_subtitle.json")
@@ -274,6 +774,11 @@ def main():
     
     json_path = sys.argv[1]
     output_filename = None
+    workers = 4
+    use_cache = False
+    rps = None
+    pretty = False
+    resume = True
     
     # 解析参数
     i = 2
@@ -287,6 +792,34 @@ def main():
             else:
                 print("--output 参数需要指定输出文件名")
                 sys.exit(1)
+        elif arg == '--no-resume':
+            resume = False
+            i += 1
+        elif arg == '--pretty':
+            pretty = True
+            i += 1
+        elif arg == '--cache':
+            use_cache = True
+            i += 1
+        elif arg == '--no-cache':
+            use_cache = False
+            i += 1
+        elif arg == '--rps':
+            try:
+                rps = float(sys.argv[i + 1])
+            except (IndexError, ValueError):
+                rps = 0
+            if rps <= 0:
+                print("--rps 参数需要指定正数")
+                sys.exit(1)
+            i += 2
+        elif arg == '--workers':
+            if i + 1 < len(sys.argv) and sys.argv[i + 1].isdigit() and int(sys.argv[i + 1]) > 0:
+                workers = int(sys.argv[i + 1])
+                i += 2
+            else:
+                print("--workers 参数需要指定正整数线程数")
+                sys.exit(1)
         else:
             print(f"未知参数: {arg}")
             i += 1
@@ -308,6 +841,8 @@ def main():
                     api_key = llm_params.get('API_KEY', '').strip()
                     model = llm_params.get('MODEL', '').strip()
                     base_url = llm_params.get('BASE_URL', '').strip()
+                    if rps is None:
+                        rps = llm_params.getfloat('LLM_RPS', fallback=None)
                     if api_key.startswith('"') and api_key.endswith('"'):
                         api_key = api_key[1:-1]
                     api_key = api_key.strip()
@@ -322,15 +857,18 @@ def main():
         if not base_url:
             base_url = os.getenv('LLM_BASE_URL')
 
-        # 创建重新排版器
-        reformatter = SubtitleReformatter(
+        # 创建重新排版器，处理结束后关闭复用的会话
+        with SubtitleReformatter(
             api_key=api_key,
             model=model,
             base_url=base_url,
-        )
-        
-        # 执行重新排版
-        output_path = reformatter.reformat_subtitle_json_file(json_path, output_filename)
+            cache_dir=DEFAULT_LLM_CACHE_DIR if use_cache else None,
+            requests_per_second=rps or 5.0,
+        ) as reformatter:
+            # 执行重新排版
+            output_path = reformatter.reformat_subtitle_json_file(
+                json_path, output_filename, max_workers=workers, pretty=pretty, resume=resume
+            )
         
         print("-" * 50)
         print(f"处理完成!")